@@ -0,0 +1,40 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Common setup for scripts driving App offscreen (soak.py and replay.py).
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from PySide6.QtCore import QSettings
+
+
+def add_config_argument(parser):
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        help="configuration file path (default is an empty configuration)",
+    )
+
+
+@contextmanager
+def temporary_settings(config=None):
+    """
+    Yields QSettings with a copy of given configuration file.
+
+    The app starts from a clean state and leaves the user's state (checkpoint,
+    shared state and metrics endpoints) untouched.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "xitomatl.ini")
+        if config:
+            shutil.copyfile(config, path)
+        settings = QSettings(path, QSettings.Format.IniFormat)
+        settings.setValue("resume", "false")
+        settings.setValue("shared_state", "false")
+        settings.remove("metrics_port")
+        settings.remove("metrics_socket")
+        yield settings
@@ -45,9 +45,8 @@ def main():
         path = os.path.join(IMAGE_DIR, filename)
         log.info("Saving %s", path)
 
-        icon = task_icon(task, state, minutes, ICON_SIZE)
-        pix = icon.pixmap(ICON_SIZE)
-        pix.save(path)
+        image = task_icon(task, state, minutes, ICON_SIZE)
+        image.save(path)
 
 
 if __name__ == "__main__":
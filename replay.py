@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Replay a trace recorded with "xitomatl --record-trace FILE".
+
+Feeds recorded input events and timer firings to App under the offscreen
+platform, at the original or maximum speed, and reports how long handling
+each event took. The app sees the monotonic and wall-clock time of the
+recording, so the schedule and history behave as when it was recorded.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QSystemTrayIcon
+
+from offscreen import add_config_argument, temporary_settings
+from xitomatl.app import App
+from xitomatl.core import ManualClock
+from xitomatl.log import init_logging, log
+from xitomatl.trace import (
+    EVENT_ACTIVATED,
+    EVENT_ANIMATION_TIMER,
+    EVENT_CLICK_TIMER,
+    EVENT_FRAME_TIMER,
+    EVENT_MENU_NEXT,
+    EVENT_MENU_START,
+    EVENT_MENU_STOP,
+    EVENT_MENU_TASK,
+    EVENT_NAMES,
+    EVENT_SCHEDULE_TIMER,
+    EVENT_TIMER,
+    read_trace,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("trace", help="trace file to replay")
+    add_config_argument(parser)
+    parser.add_argument(
+        "--max-speed",
+        default=False,
+        action="store_true",
+        help="replay events without waiting between them",
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=10,
+        help="number of slowest events to list (default %(default)s)",
+    )
+    return parser.parse_args()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[round(fraction * (len(values) - 1))]
+
+
+class Replay:
+    def __init__(self, app, records, max_speed):
+        """Replays records in app created with clock and wall_clock."""
+        self.app = app
+        self.pomodoro = app.pomodoro
+        self.clock = self.pomodoro.clock
+        self.wall_clock = self.pomodoro.wall_clock
+        self.wall_start = self.wall_clock() - self.clock()
+        self.records = records
+        self.max_speed = max_speed
+        self.index = 0
+        self.started = 0.0
+        # List of (record, handler seconds, seconds until icon is rendered)
+        self.results = []
+
+        # Only recorded timer firings drive the app.
+        for timer in (
+            self.pomodoro.timer,
+            self.pomodoro.schedule_timer,
+            app.click_timer,
+            app.frame_timer,
+            app.animation.timer,
+        ):
+            timer.blockSignals(True)
+
+        # pylint: disable=protected-access
+        self.handlers = {
+            EVENT_ACTIVATED: lambda arg: app.on_activated(
+                QSystemTrayIcon.ActivationReason(arg)
+            ),
+            EVENT_CLICK_TIMER: lambda _: app.on_icon_single_click(),
+            EVENT_MENU_START: lambda _: self.pomodoro.start(),
+            EVENT_MENU_NEXT: lambda _: self.pomodoro.next(),
+            EVENT_MENU_STOP: lambda _: self.pomodoro.stop(),
+            EVENT_MENU_TASK: self.pomodoro.start_task,
+            EVENT_TIMER: lambda _: self.pomodoro.on_timeout(),
+            EVENT_SCHEDULE_TIMER: lambda _: self.pomodoro.on_schedule_timeout(),
+            # Replayed state can differ from the recorded one if the
+            # configuration or images differ.
+            EVENT_FRAME_TIMER: lambda _: app.frame_delays and app.on_frame_timeout(),
+            EVENT_ANIMATION_TIMER: lambda _: app.animation._loop(),
+        }
+
+    def run(self):
+        self.started = time.monotonic()
+        QTimer.singleShot(0, self._next)
+        self.app.exec()
+
+    def _next(self):
+        record = self.records[self.index]
+        self.clock.now = record.time
+        self.wall_clock.now = self.wall_start + record.time
+
+        handler = self.handlers.get(record.event)
+        if handler is None:
+            log.warning("Skipping unknown event type %s", record.event)
+        else:
+            start = time.perf_counter()
+            try:
+                handler(record.arg)
+            except Exception:
+                log.exception("Failed to replay %s event", EVENT_NAMES[record.event])
+            handled = time.perf_counter()
+            self.app.renderer.wait()
+            rendered = time.perf_counter()
+            self.results.append((record, handled - start, rendered - start))
+
+        self.index += 1
+        if self.index == len(self.records):
+            self.app.app.quit()
+            return
+
+        delay = 0
+        if not self.max_speed:
+            due = self.started + self.records[self.index].time
+            delay = max(0, int((due - time.monotonic()) * 1000))
+        QTimer.singleShot(delay, self._next)
+
+
+def report(results, slowest):
+    by_event = {}
+    for record, handler, total in results:
+        by_event.setdefault(record.event, []).append((record, handler, total))
+
+    log.info(
+        "%-16s %6s %9s %9s %9s %9s %9s",
+        "event",
+        "count",
+        "mean ms",
+        "p95 ms",
+        "max ms",
+        "icon max",
+        "rec max",
+    )
+    for event, items in sorted(by_event.items()):
+        handlers = [handler * 1000 for _, handler, _ in items]
+        log.info(
+            "%-16s %6d %9.2f %9.2f %9.2f %9.2f %9.2f",
+            EVENT_NAMES.get(event, event),
+            len(items),
+            sum(handlers) / len(handlers),
+            percentile(handlers, 0.95),
+            max(handlers),
+            max(total for _, _, total in items) * 1000,
+            max(record.duration for record, _, _ in items) * 1000,
+        )
+
+    log.info("Slowest events (including icon rendering):")
+    for record, handler, total in sorted(results, key=lambda x: -x[2])[:slowest]:
+        log.info(
+            "  %10.3f s %-16s arg %-4s handler %.2f ms, icon %.2f ms, recorded %.2f ms",
+            record.time,
+            EVENT_NAMES.get(record.event, record.event),
+            record.arg,
+            handler * 1000,
+            total * 1000,
+            record.duration * 1000,
+        )
+
+
+def main():
+    args = parse_args()
+    init_logging()
+
+    trace = read_trace(args.trace)
+    if not trace.records:
+        log.error("No events in trace %s", args.trace)
+        return 1
+
+    with temporary_settings(args.config) as settings:
+        app = App(
+            [sys.argv[0]],
+            settings,
+            clock=ManualClock(),
+            wall_clock=ManualClock(trace.started),
+        )
+        replay = Replay(app, trace.records, args.max_speed)
+        replay.run()
+
+    report(replay.results, args.slowest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
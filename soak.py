@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Soak test for the tray pipeline.
+
+Drives App through many state transitions, timer ticks and animation frames
+using a virtual clock and fails if memory usage keeps growing.
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import shiboken6
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import QSystemTrayIcon
+
+from offscreen import add_config_argument, temporary_settings
+from xitomatl.app import App
+from xitomatl.core import ManualClock
+from xitomatl.log import init_logging, log
+
+SAMPLE_COUNT = 50
+ANIMATION_FRAMES = 5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=1000000,
+        help="number of actions to run (default %(default)s)",
+    )
+    add_config_argument(parser)
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="random seed (default %(default)s)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=0.2,
+        help="part of the run ignored when checking growth (default %(default)s)",
+    )
+    parser.add_argument(
+        "--max-python-slope",
+        type=float,
+        default=8.0,
+        help="maximum traced Python memory growth in bytes per iteration"
+        " (default %(default)s)",
+    )
+    parser.add_argument(
+        "--max-rss-slope",
+        type=float,
+        default=64.0,
+        help="maximum RSS growth in bytes per iteration (default %(default)s)",
+    )
+    parser.add_argument(
+        "--max-qt-objects-slope",
+        type=float,
+        default=0.01,
+        help="maximum growth of live Qt wrapper objects per iteration"
+        " (default %(default)s)",
+    )
+    return parser.parse_args()
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource  # pylint: disable=import-outside-toplevel
+
+        # Peak RSS is the best approximation available on other systems.
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def qt_object_count():
+    return sum(
+        1 for obj in gc.get_objects() if isinstance(obj, shiboken6.Shiboken.Object)
+    )
+
+
+def slope(samples):
+    """Least squares slope of (x, y) samples."""
+    n = len(samples)
+    if n < 2:
+        return 0.0
+
+    mean_x = sum(x for x, _ in samples) / n
+    mean_y = sum(y for _, y in samples) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in samples)
+    if var_x == 0:
+        return 0.0
+
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in samples)
+    return cov / var_x
+
+
+class Soak:
+    def __init__(self, app, rng):
+        self.app = app
+        self.pomodoro = app.pomodoro
+        self.rng = rng
+        self.clock = self.pomodoro.clock
+        self.actions = (
+            (self.tick, 20),
+            (self.click, 4),
+            (self.middle_click, 1),
+            (self.start_task, 2),
+            (self.next, 2),
+            (self.start, 1),
+        )
+        self.action_functions = [action for action, _ in self.actions]
+        self.action_weights = [weight for _, weight in self.actions]
+
+    def tick(self):
+        self.clock.advance(self.rng.randrange(1000, 120000) / 1000)
+        # Same as when the timer fires.
+        self.pomodoro.timer.timeout.emit()
+
+    def click(self):
+        self.app.on_activated(QSystemTrayIcon.ActivationReason.Trigger)
+        self.app.click_timer.stop()
+        self.app.on_icon_single_click()
+
+    def middle_click(self):
+        self.app.on_activated(QSystemTrayIcon.ActivationReason.MiddleClick)
+
+    def start_task(self):
+        self.pomodoro.start_task(self.rng.randrange(len(self.pomodoro.tasks)))
+
+    def next(self):
+        self.pomodoro.next()
+
+    def start(self):
+        self.pomodoro.start()
+
+    def animate(self):
+        for _ in range(ANIMATION_FRAMES):
+            self.app.animation.set_rotation(self.rng.uniform(-15.0, 15.0))
+
+    def step(self):
+        action = self.rng.choices(self.action_functions, self.action_weights)[0]
+        action()
+        self.animate()
+        self.app.renderer.wait()
+        QCoreApplication.processEvents()
+
+
+def check(name, samples, warmup, max_slope):
+    start = int(len(samples) * warmup)
+    value = slope(samples[start:])
+    ok = value <= max_slope
+    log.info(
+        "%s: %s -> %s, slope %.4f per iteration (max %s) %s",
+        name,
+        samples[start][1],
+        samples[-1][1],
+        value,
+        max_slope,
+        "OK" if ok else "FAILED",
+    )
+    return ok
+
+
+def main():
+    args = parse_args()
+    init_logging()
+
+    with temporary_settings(args.config) as settings:
+        settings.setValue("autostart", "false")
+        app = App([sys.argv[0]], settings, clock=ManualClock())
+        return run(app, args)
+
+
+def run(app, args):
+    soak = Soak(app, random.Random(args.seed))  # nosec B311
+    sample_every = max(1, args.iterations // SAMPLE_COUNT)
+    python_samples = []
+    rss_samples = []
+    qt_samples = []
+
+    tracemalloc.start()
+    for i in range(1, args.iterations + 1):
+        soak.step()
+        if i % sample_every == 0:
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            python_samples.append((i, current))
+            rss_samples.append((i, rss_bytes()))
+            qt_samples.append((i, qt_object_count()))
+            log.info(
+                "Iteration %s/%s: python %s B, RSS %s B, Qt objects %s",
+                i,
+                args.iterations,
+                current,
+                rss_samples[-1][1],
+                qt_samples[-1][1],
+            )
+    tracemalloc.stop()
+
+    if len(python_samples) < 2:
+        log.error("Not enough samples, increase number of iterations")
+        return 2
+
+    results = [
+        check("Python memory", python_samples, args.warmup, args.max_python_slope),
+        check("RSS", rss_samples, args.warmup, args.max_rss_slope),
+        check("Qt objects", qt_samples, args.warmup, args.max_qt_objects_slope),
+    ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
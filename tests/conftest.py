@@ -0,0 +1,50 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+import os
+import subprocess  # nosec B404
+import sys
+from unittest.mock import Mock
+
+import pytest
+from PySide6.QtGui import QGuiApplication
+
+from xitomatl.core import ManualClock
+
+
+class Settings(Mock):
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.values = kwargs
+
+    def value(self, key, default=None):
+        return self.values.get(key, default)
+
+    def childKeys(self):
+        return []
+
+
+def imported_modules(module):
+    """Returns names of all modules loaded by importing module."""
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    return set(result.stdout.split())
+
+
+def assert_imports_no_qt(module, allowed=()):
+    """Asserts that importing module loads no Qt modules except allowed ones."""
+    modules = imported_modules(module)
+    assert sorted(m for m in modules if m.startswith("PySide6.Qt")) == sorted(allowed)
+    if not allowed:
+        assert "PySide6" not in modules
+
+
+@pytest.fixture
+def clock():
+    return ManualClock(1000.0)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return QGuiApplication.instance() or QGuiApplication([])
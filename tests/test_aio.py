@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+import asyncio
+from subprocess import CalledProcessError  # nosec B404
+
+import pytest
+
+from tests.conftest import Settings, assert_imports_no_qt
+from xitomatl.aio import AsyncTimer
+from xitomatl.core import Change, State
+
+
+def run(coroutine):
+    return asyncio.run(coroutine())
+
+
+def test_aio_does_not_import_qt():
+    assert_imports_no_qt("xitomatl.aio")
+
+
+def test_aio_actions_and_events():
+    async def test():
+        async with AsyncTimer(Settings(autostart="false")) as timer:
+            events = timer.events()
+            event = await anext(events)
+            assert event.changes == Change.ALL
+            assert event.state == State.Stopped
+
+            await timer.start()
+            event = await anext(events)
+            assert event.changed(Change.STATE)
+            assert event.task_index == 0
+            assert timer.pomodoro.timer is not None
+
+            await timer.start_task(2)
+            assert (await anext(events)).task_index == 2
+
+            await timer.next()
+            assert (await anext(events)).task_index == 3
+
+            await timer.stop()
+            event = await anext(events)
+            assert event.state == State.Stopped
+            assert timer.pomodoro.timer is None
+
+        assert [e async for e in events] == []
+
+    run(test)
+
+
+def test_aio_timer_update():
+    async def test():
+        async with AsyncTimer(Settings()) as timer:
+            loop = asyncio.get_running_loop()
+            delay = timer.pomodoro.timer.when() - loop.time()
+            assert 60 < delay <= 61
+
+            events = timer.events()
+            await anext(events)
+            timer.pomodoro.started -= 60
+            timer.pomodoro.on_timeout()
+            event = await anext(events)
+            assert event.changes == Change.MINUTE
+            assert event.remaining_minutes == 24
+
+    run(test)
+
+
+def test_aio_events_merged_when_consumer_lags():
+    async def test():
+        async with AsyncTimer(Settings(), max_queued_events=2) as timer:
+            events = timer.events()
+            for _ in range(3):
+                await timer.next()
+
+            assert (await anext(events)).changes == Change.ALL
+            event = await anext(events)
+            assert event.changed(Change.TASK | Change.MINUTE)
+            assert event.task_index == 3
+
+    run(test)
+
+
+def test_aio_close_event_stream():
+    async def test():
+        async with AsyncTimer(Settings()) as timer:
+            events = timer.events()
+            events.close()
+            assert not timer.pomodoro.listeners
+            assert [e async for e in events] == [timer.pomodoro.last_event]
+
+    run(test)
+
+
+def test_aio_many_timers():
+    async def test():
+        timers = [AsyncTimer(Settings()) for _ in range(100)]
+        await asyncio.gather(*(t.start_task(i % 8) for i, t in enumerate(timers)))
+        indexes = [t.pomodoro.current_task_index for t in timers]
+        assert indexes[:9] == [0, 1, 2, 3, 4, 5, 6, 7, 0]
+        for timer in timers:
+            await timer.aclose()
+
+    run(test)
+
+
+def test_aio_commands():
+    async def test():
+        async with AsyncTimer(Settings(autostart="false")) as timer:
+            timer.pomodoro.tasks[0].command_start = "true\ntrue"
+            await timer.start()
+
+            timer.pomodoro.tasks[1].command_start = "false"
+            with pytest.raises(CalledProcessError):
+                await timer.next()
+            assert timer.pomodoro.current_task_index == 1
+
+    run(test)
+
+
+def test_aio_malformed_command():
+    async def test():
+        async with AsyncTimer(Settings(autostart="false")) as timer:
+            timer.pomodoro.tasks[0].command_start = 'echo "unbalanced'
+            with pytest.raises(ValueError):
+                await asyncio.wait_for(timer.start(), 5)
+
+            await asyncio.wait_for(timer.next(), 5)
+            assert timer.pomodoro.current_task_index == 1
+            assert timer.pomodoro.command_runner is None
+
+    run(test)
@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+from xitomatl.attention import AttentionPolicy, AttentionSettings
+from xitomatl.core.tasks import Task
+
+
+def policy(clock, **kwargs):
+    return AttentionPolicy(AttentionSettings(**kwargs), clock=clock)
+
+
+def test_attention_backoff(clock):
+    p = policy(clock, interval=20, backoff=2, max_interval=100)
+    intervals = []
+    for _ in range(5):
+        intervals.append(p.next_interval())
+        clock.now += p.next_interval()
+        assert p.should_animate()
+    assert intervals == [20, 40, 80, 100, 100]
+
+
+def test_attention_saved_frames(clock):
+    p = policy(clock, interval=20, backoff=2, max_interval=1000)
+    p.record(100)
+    clock.now += 20
+    assert p.should_animate()
+    assert p.saved_frames == 0
+
+    # Animating once in 40 seconds instead of twice.
+    clock.now += 40
+    assert p.should_animate()
+    assert p.saved_frames == 100
+
+
+def test_attention_frames_per_hour(clock):
+    p = policy(clock, interval=60, backoff=1, frames_per_hour=250)
+    p.record(100)
+    clock.now += 60
+    assert p.should_animate()
+    p.record(100)
+    clock.now += 60
+    assert not p.should_animate()
+    assert p.saved_frames == 100
+
+    clock.now += 3600
+    assert p.should_animate()
+
+
+def test_attention_pause(clock):
+    p = policy(clock, click_pause=60)
+    p.user_activity()
+    clock.now += 30
+    assert not p.should_animate()
+    clock.now += 30
+    assert p.should_animate()
+    assert not p.should_animate(idle=True)
+    assert policy(clock, idle_pause=False).should_animate(idle=True)
+
+
+def test_attention_from_task():
+    task = Task(animation_interval=5, animation_frames_per_hour=10)
+    p = AttentionPolicy.from_task(task)
+    assert p.next_interval() == 5
+    assert p.settings.frames_per_hour == 10
@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+import pytest
+
+from tests.conftest import Settings, assert_imports_no_qt, imported_modules
+from xitomatl.core import Change, Color, Pomodoro, State
+from xitomatl.core.tasks import DEFAULT_TASK_CACHE_KEY, Task, read_task
+
+
+def test_core_does_not_import_qt():
+    assert_imports_no_qt("xitomatl.core")
+    assert "http.server" not in imported_modules("xitomatl.core")
+
+
+def test_core_clock(clock):
+    pomodoro = Pomodoro(Settings(), clock=clock)
+    assert pomodoro.state == State.Running
+    assert pomodoro.remaining_minutes() == 25
+    assert pomodoro.update() == (61000, False)
+
+    clock.now += 60.5
+    assert pomodoro.elapsed_minutes() == 1
+    assert pomodoro.update() == (60500, False)
+
+    clock.now += 24 * 60
+    assert pomodoro.finished is False
+    assert pomodoro.update() == (60500, False)
+    assert pomodoro.finished is True
+
+    pomodoro.next()
+    assert pomodoro.elapsed_milliseconds() == 0
+
+    pomodoro.stop()
+    assert pomodoro.update() == (None, False)
+
+
+def test_core_countdown(clock):
+    pomodoro = Pomodoro(Settings(countdown_seconds="10"), clock=clock)
+
+    clock.now += 25 * 60 - 5.5
+    assert pomodoro.update() == (520, True)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("transparent", (0, 0, 0, 0)),
+        ("White", (255, 255, 255, 255)),
+        ("purple", (128, 0, 128, 255)),
+        ("#f04", (255, 0, 68, 255)),
+        ("#ff0040", (255, 0, 64, 255)),
+        ("#80ff0040", (255, 0, 64, 128)),
+        ("#8f04", (255, 0, 68, 136)),
+        ("#fff000404", (255, 0, 64, 255)),
+        ("#ffff00004040", (255, 0, 64, 255)),
+    ],
+)
+def test_color_parse(text, expected):
+    assert Color.parse(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "#", "#12345", "#+12345", "nocolor"])
+def test_color_parse_invalid(text, caplog):
+    assert Color.parse(text) == (0, 0, 0, 255)
+    assert f"Invalid color: {text}" in caplog.text
+
+
+def test_color_name():
+    assert Color.parse("#ff0040").name() == "#ff0040"
+    assert Color.parse("#80ff0040").name() == "#80ff0040"
+
+
+def test_read_task_colors():
+    settings = Settings(name="focus", color="#ff0040", text_color="black")
+    task = read_task(settings, {DEFAULT_TASK_CACHE_KEY: Task()})
+    assert task.color == Color(255, 0, 64, 255)
+    assert task.text_color == Color(0, 0, 0, 255)
+
+
+def test_read_task_invalid_color():
+    settings = Settings(name="focus", color="nocolor", text_color="white")
+    task = read_task(settings, {DEFAULT_TASK_CACHE_KEY: Task()})
+    assert task.color == Color(0, 0, 0, 255)
+    assert task.text_color == Color(255, 255, 255, 255)
+
+
+class RecordingPomodoro(Pomodoro):
+    def __init__(self, *args, **kwargs):
+        self.events = []
+        super().__init__(*args, **kwargs)
+
+    def _emit_change(self, event):
+        self.events.append(event)
+
+
+def test_core_change_events(clock):
+    pomodoro = RecordingPomodoro(Settings(), clock=clock)
+    assert [e.changes for e in pomodoro.events] == [Change.ALL]
+    pomodoro.events.clear()
+
+    pomodoro.update()
+    assert not pomodoro.events
+
+    clock.now += 60
+    pomodoro.update()
+    assert [e.changes for e in pomodoro.events] == [Change.MINUTE]
+    assert pomodoro.events[0].remaining_minutes == 24
+    pomodoro.events.clear()
+
+    clock.now += 24 * 60
+    pomodoro.update()
+    assert [e.changes for e in pomodoro.events] == [
+        Change.MINUTE | Change.TIMED_OUT | Change.FINISHED
+    ]
+    assert pomodoro.events[0].timed_out
+    pomodoro.events.clear()
+
+    pomodoro.next()
+    assert [e.changes for e in pomodoro.events] == [
+        Change.TASK | Change.MINUTE | Change.TIMED_OUT | Change.FINISHED
+    ]
+    assert pomodoro.events[0].task_index == 1
+    pomodoro.events.clear()
+
+    pomodoro.stop()
+    assert pomodoro.events[0].changed(Change.STATE)
+    assert pomodoro.events[0].state == State.Stopped
+
+
+def test_core_change_events_progress(clock):
+    pomodoro = RecordingPomodoro(Settings(), clock=clock)
+    pomodoro.tasks[0].progress_ring = True
+    pomodoro.events.clear()
+
+    clock.now += 5
+    pomodoro.update()
+    assert [e.changes for e in pomodoro.events] == [Change.PROGRESS]
@@ -0,0 +1,44 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+import json
+
+import pytest
+
+from tests.conftest import Settings, assert_imports_no_qt
+from xitomatl.headless import run_command
+from xitomatl.pomodoro import Pomodoro, State
+
+
+def test_headless_does_not_import_gui():
+    assert_imports_no_qt("xitomatl.headless", allowed=["PySide6.QtCore"])
+
+
+def test_headless_commands():
+    pomodoro = Pomodoro(Settings(autostart="0"))
+    assert pomodoro.state == State.Stopped
+
+    assert run_command(pomodoro, "toggle") is None
+    assert pomodoro.state == State.Running
+    assert pomodoro.current_task_index == 0
+
+    run_command(pomodoro, "toggle")
+    assert pomodoro.current_task_index == 1
+
+    run_command(pomodoro, " task 3 ")
+    assert pomodoro.current_task_index == 2
+
+    run_command(pomodoro, "stop")
+    assert pomodoro.state == State.Stopped
+
+    run_command(pomodoro, "start")
+    assert pomodoro.state == State.Running
+
+    data = json.loads(run_command(pomodoro, "status"))
+    assert data["task_index"] == pomodoro.current_task_index
+    assert data["state"] == "running"
+
+
+@pytest.mark.parametrize("line", ["", "bogus", "stop now", "task", "task x", "task 0"])
+def test_headless_invalid_commands(line):
+    pomodoro = Pomodoro(Settings())
+    with pytest.raises(ValueError):
+        run_command(pomodoro, line)
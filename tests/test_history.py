@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+from datetime import date, datetime, timedelta
+
+from tests.conftest import Settings
+from xitomatl.history import (
+    END_NEXT,
+    END_RESTART,
+    END_STOP,
+    Session,
+    SessionHistory,
+    format_duration,
+)
+from xitomatl.pomodoro import Pomodoro
+
+TODAY = date(2026, 10, 19)
+MORNING = datetime(2026, 10, 19, 9, 0).timestamp()
+YESTERDAY = datetime(2026, 10, 18, 9, 0).timestamp()
+
+
+def test_format_duration():
+    assert format_duration(59) == "0m"
+    assert format_duration(25 * 60) == "25m"
+    assert format_duration(125 * 60 + 30) == "2h05m"
+
+
+def test_history_summary_text():
+    history = SessionHistory()
+    assert history.summary_text(TODAY) == ""
+
+    history.record(Session(MORNING, 25 * 60, 0, "focus", 25, END_NEXT))
+    history.record(Session(MORNING + 1500, 5 * 60, 1, "break", 5, END_NEXT))
+    history.record(Session(MORNING + 1800, 37 * 60, 2, "focus", 25, END_STOP))
+    history.record(Session(YESTERDAY, 25 * 60, 0, "focus", 25, END_NEXT))
+
+    assert history.summary_text(TODAY) == "Today: break 1× 5m, focus 2× 1h02m +12m"
+
+
+def test_history_summary_text_updated_on_record():
+    history = SessionHistory()
+    history.record(Session(MORNING, 25 * 60, 0, "focus", 25, END_NEXT))
+    assert history.summary_text(TODAY) == "Today: focus 1× 25m"
+
+    history.record(Session(MORNING + 1500, 25 * 60, 0, "focus", 25, END_NEXT))
+    assert history.summary_text(TODAY) == "Today: focus 2× 50m"
+
+
+def test_history_ring_buffer_evicts_oldest():
+    history = SessionHistory(capacity=3)
+    for i in range(5):
+        history.record(Session(MORNING + i * 1500, 25 * 60, 0, "focus", 25, END_NEXT))
+
+    assert len(history) == 3
+    assert sorted(history.started) == [MORNING + i * 1500 for i in range(2, 5)]
+    assert history.summary_text(TODAY) == "Today: focus 3× 1h15m"
+
+    history.record(Session(YESTERDAY, 5 * 60, 1, "break", 5, END_NEXT))
+    assert history.summary_text(TODAY) == "Today: focus 2× 50m"
+
+
+def test_history_summarize_window():
+    history = SessionHistory()
+    history.record(Session(YESTERDAY, 25 * 60, 0, "focus", 25, END_NEXT))
+    history.record(Session(MORNING, 30 * 60, 0, "focus", 25, END_NEXT))
+    history.record(Session(MORNING + 1800, 5 * 60, 1, "break", 5, END_NEXT))
+
+    week = history.summarize(since=MORNING - timedelta(days=7).total_seconds())
+    assert week["focus"].count == 2
+    assert week["focus"].duration == 55 * 60
+    assert week["focus"].overtime == 5 * 60
+    assert week["break"].count == 1
+
+    yesterday = history.summarize(since=YESTERDAY, until=MORNING)
+    assert list(yesterday) == ["focus"]
+    assert yesterday["focus"].count == 1
+
+
+def test_pomodoro_records_sessions():
+    pomodoro = Pomodoro(Settings())
+    pomodoro.next()
+    pomodoro.next()
+    pomodoro.stop()
+
+    history = pomodoro.history
+    assert len(history) == 3
+    assert list(history.task_index[:3]) == [0, 1, 2]
+    assert list(history.reason[:3]) == [END_NEXT, END_NEXT, END_STOP]
+    assert pomodoro.summary().startswith("Today: break 1× 0m, focus 2× 0m")
+
+
+def test_pomodoro_start_after_next_keeps_task_and_history():
+    pomodoro = Pomodoro(Settings())
+    pomodoro.next()
+    pomodoro.start()
+
+    assert pomodoro.current_task_index == 1
+    assert len(pomodoro.history) == 2
+    assert list(pomodoro.history.reason[:2]) == [END_NEXT, END_RESTART]
+
+
+def test_pomodoro_start_after_stop_keeps_history():
+    pomodoro = Pomodoro(Settings())
+    pomodoro.next()
+    pomodoro.stop()
+    pomodoro.start()
+
+    assert pomodoro.current_task_index == 0
+    assert len(pomodoro.history) == 2
@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+from copy import copy
+from dataclasses import replace
+
+import pytest
+
+from xitomatl.core import Color, State, Task
+from xitomatl.icon import (
+    IconLayers,
+    IconRequest,
+    ImageFrames,
+    collect_frames,
+    task_icon,
+)
+
+STROKED_TASK = replace(
+    Task(),
+    text_stroke_width=5,
+    text_stroke_color=Color.parse("black"),
+    text_x=10,
+    text_y=10,
+)
+
+
+def test_collect_frames():
+    frames = [(i, 100) for i in range(5)]
+    assert collect_frames(frames, max_frames=10) == ([0, 1, 2, 3, 4], [100] * 5)
+
+
+def test_collect_frames_caps_frame_rate():
+    frames = [(i, 40) for i in range(6)]
+    assert collect_frames(frames, max_frames=10, min_delay=100) == (
+        [0, 3],
+        [120, 120],
+    )
+
+
+def test_collect_frames_limits_count():
+    frames = [(i, 100) for i in range(10)]
+    kept, delays = collect_frames(frames, max_frames=4)
+    assert kept == [0, 4, 8]
+    assert delays == [400, 400, 200]
+    assert sum(delays) == 1000
+
+
+def test_image_frames_wrap_around():
+    frames = ImageFrames(["a", "b"], [100, 100])
+    assert len(frames) == 2
+    assert frames.frame(3) == "b"
+
+
+def test_icon_request_key_compares_task_values():
+    task = Task()
+    request = IconRequest(task, State.Running, 25, 64)
+    assert request.key() == IconRequest(copy(task), State.Running, 25, 64).key()
+
+    changed = replace(task, color=Color.parse("black"))
+    assert request.key() != IconRequest(changed, State.Running, 25, 64).key()
+
+
+def changed_pixels_rect(image, background):
+    """Returns (left, top, right, bottom) of pixels differing from background."""
+    points = [
+        (x, y)
+        for x in range(image.width())
+        for y in range(image.height())
+        if image.pixel(x, y) != background.pixel(x, y)
+    ]
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+@pytest.mark.parametrize(
+    "task, state, remaining_minutes",
+    [
+        (Task(), State.Running, 25),
+        (Task(), State.Running, -3),
+        (Task(), State.Stopped, 25),
+        (STROKED_TASK, State.Running, 25),
+    ],
+    ids=["running", "timed-out", "stopped", "stroked"],
+)
+def test_icon_layers_match_task_icon(qapp, task, state, remaining_minutes):
+    layers = IconLayers()
+    request = IconRequest(task, state, remaining_minutes, 64)
+    expected = task_icon(task, state, remaining_minutes, 64)
+    assert layers.icon(request) == expected
+    # Rendered again from cached layers.
+    assert layers.icon(request) == expected
+
+
+def test_icon_layers_countdown(qapp):
+    layers = IconLayers()
+    request = IconRequest(STROKED_TASK, State.Running, 25, 64, countdown_seconds=42)
+    icon = layers.icon(request)
+    assert layers.atlas.glyphs
+    assert IconLayers().icon(request) == icon
+
+    # Digits are placed by the atlas close to where the text would be drawn.
+    background = layers.background(STROKED_TASK, State.Running, 64)
+    expected = task_icon(STROKED_TASK, State.Running, 42, 64)
+    actual_rect = changed_pixels_rect(icon, background)
+    expected_rect = changed_pixels_rect(expected, background)
+    for actual, expected in zip(actual_rect, expected_rect, strict=True):
+        assert abs(actual - expected) <= 3
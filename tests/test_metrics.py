@@ -0,0 +1,146 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+import socket
+from subprocess import CalledProcessError
+from unittest.mock import patch
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from xitomatl.core.pomodoro import _run
+from xitomatl.metrics import Metrics
+from xitomatl.metrics_server import serve_metrics
+from xitomatl.state import State
+
+
+@pytest.fixture
+def metrics():
+    metrics = Metrics()
+    with (
+        patch("xitomatl.core.pomodoro.metrics", metrics),
+        patch("xitomatl.core.pomodoro.run"),
+    ):
+        yield metrics
+
+
+def test_metrics_counters():
+    metrics = Metrics()
+    metrics.inc("xitomatl_actions_total", action="start")
+    metrics.inc("xitomatl_actions_total", action="start")
+    metrics.inc("xitomatl_actions_total", action="stop")
+    metrics.inc("xitomatl_icon_renders_total")
+
+    text = metrics.render()
+    assert 'xitomatl_actions_total{action="start"} 2\n' in text
+    assert 'xitomatl_actions_total{action="stop"} 1\n' in text
+    assert "xitomatl_icon_renders_total 1\n" in text
+    assert "# TYPE xitomatl_actions_total counter\n" in text
+
+
+def test_metrics_status():
+    metrics = Metrics()
+    metrics.set_status(0, "focus", State.Running, 25)
+
+    text = metrics.render()
+    assert "xitomatl_state 1\n" in text
+    assert 'xitomatl_task_info{index="1",name="focus"} 1\n' in text
+    values = dict(line.split() for line in text.splitlines() if line[0] != "#")
+    assert 0.0 <= float(values["xitomatl_elapsed_seconds"]) < 1.0
+    assert 1499.0 < float(values["xitomatl_remaining_seconds"]) <= 1500.0
+
+
+def test_metrics_status_stopped():
+    metrics = Metrics()
+    metrics.set_status(-1, "stopped", State.Stopped, 0)
+
+    text = metrics.render()
+    assert "xitomatl_state 0\n" in text
+    assert "xitomatl_remaining_seconds" not in text
+
+
+def test_metrics_hook_histogram(metrics):
+    _run("cmd1\ncmd2", "start")
+
+    text = metrics.render()
+    assert 'xitomatl_hook_duration_seconds_bucket{hook="start",le="+Inf"} 2\n' in text
+    assert 'xitomatl_hook_duration_seconds_count{hook="start"} 2\n' in text
+    assert 'xitomatl_hook_exit_codes_total{code="0",hook="start"} 2\n' in text
+
+
+def test_metrics_hook_exit_code(metrics):
+    with patch("xitomatl.core.pomodoro.run") as run:
+        run.side_effect = CalledProcessError(3, "cmd")
+        with pytest.raises(CalledProcessError):
+            _run("cmd", "finish")
+
+    text = metrics.render()
+    assert 'xitomatl_hook_exit_codes_total{code="3",hook="finish"} 1\n' in text
+
+
+def test_metrics_server():
+    metrics = Metrics()
+    metrics.inc("xitomatl_animation_frames_total", 5)
+    server = serve_metrics(port=0, metrics=metrics)
+    try:
+        host, port = server.server_address
+        assert host == "127.0.0.1"
+        with urlopen(f"http://{host}:{port}/metrics") as response:  # nosec B310
+            text = response.read().decode()
+        assert "xitomatl_animation_frames_total 5\n" in text
+
+        with pytest.raises(HTTPError):
+            urlopen(f"http://{host}:{port}/other")  # nosec B310
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_server_unix_socket(tmp_path):
+    metrics = Metrics()
+    metrics.inc("xitomatl_icon_renders_total", 3)
+    path = str(tmp_path / "metrics.sock")
+    server = serve_metrics(socket_path=path, metrics=metrics)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall(b"GET /metrics HTTP/1.0\r\n\r\n")
+            response = b""
+            while data := client.recv(4096):
+                response += data
+        assert response.startswith(b"HTTP/1.0 200")
+        assert b"xitomatl_icon_renders_total 3\n" in response
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_server_replaces_stale_socket(tmp_path):
+    path = str(tmp_path / "metrics.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(path)
+
+    server = serve_metrics(socket_path=path, metrics=Metrics())
+    server.shutdown()
+    server.server_close()
+
+
+def test_metrics_server_keeps_other_files(tmp_path):
+    path = tmp_path / "metrics.sock"
+    path.write_text("data")
+
+    with pytest.raises(FileExistsError):
+        serve_metrics(socket_path=str(path), metrics=Metrics())
+    assert path.read_text() == "data"
+
+
+def test_metrics_server_keeps_socket_in_use(tmp_path):
+    path = str(tmp_path / "metrics.sock")
+    server = serve_metrics(socket_path=path, metrics=Metrics())
+    try:
+        with pytest.raises(FileExistsError):
+            serve_metrics(socket_path=path, metrics=Metrics())
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+    finally:
+        server.shutdown()
+        server.server_close()
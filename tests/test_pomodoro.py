@@ -1,23 +1,14 @@
 # SPDX-License-Identifier: LGPL-2.0-or-later
+import json
 from contextlib import contextmanager
 from copy import copy
 from unittest.mock import Mock, call, patch
 
+from tests.conftest import Settings
+from xitomatl.core.events import Change
 from xitomatl.pomodoro import SHORT_BREAK_COUNT, Pomodoro, State
 
 
-class Settings(Mock):
-    def __init__(self, **kwargs):
-        super().__init__()
-        self.values = kwargs
-
-    def value(self, key, default=None):
-        return self.values.get(key, default)
-
-    def childKeys(self):
-        return []
-
-
 @contextmanager
 def mock_commands_run(pomodoro):
     for i, task in enumerate(pomodoro.tasks):
@@ -27,7 +18,7 @@ def mock_commands_run(pomodoro):
         task.command_stop = f"stop{i}"
         task.command_finish = f"finish{i}"
 
-    with patch("xitomatl.pomodoro.run") as run:
+    with patch("xitomatl.core.pomodoro.run") as run:
         run2 = Mock()
         run.side_effect = lambda x, **_kw: run2(x)
         yield run2
@@ -201,3 +192,151 @@ def test_pomodoro_command_execute_multiple():
         """
         pomodoro.stop()
         assert run.call_args_list == [call(["stop0.1"]), call(["stop0.2"])]
+
+
+def test_pomodoro_countdown_disabled():
+    settings = Settings()
+    pomodoro = Pomodoro(settings)
+
+    pomodoro.tasks[0].minutes = 1
+    pomodoro.start()
+    assert pomodoro.is_countdown() is False
+    assert pomodoro.timer.interval() > 60000
+
+
+def test_pomodoro_countdown():
+    settings = Settings(countdown_seconds="60")
+    pomodoro = Pomodoro(settings)
+
+    pomodoro.tasks[0].minutes = 1
+    pomodoro.start()
+    assert pomodoro.is_countdown() is True
+    assert pomodoro.remaining_seconds() == 60
+    assert pomodoro.timer.interval() <= 1000
+
+
+def test_pomodoro_countdown_scheduled():
+    settings = Settings(countdown_seconds="10")
+    pomodoro = Pomodoro(settings)
+
+    pomodoro.tasks[0].minutes = 1
+    pomodoro.start()
+    assert pomodoro.is_countdown() is False
+    assert 49000 < pomodoro.timer.interval() <= 50000 + 1000
+
+
+def test_pomodoro_countdown_not_shown_when_stopped():
+    settings = Settings(autostart="0", countdown_seconds="60")
+    pomodoro = Pomodoro(settings)
+
+    assert pomodoro.is_countdown() is False
+
+
+def test_pomodoro_progress():
+    settings = Settings()
+    pomodoro = Pomodoro(settings)
+
+    assert 0.0 <= pomodoro.progress() < 0.01
+    pomodoro.tasks[0].minutes = 0
+    assert pomodoro.progress() == 1.0
+
+
+def test_pomodoro_progress_ring_scheduled():
+    settings = Settings(autostart="0")
+    pomodoro = Pomodoro(settings)
+
+    pomodoro.tasks[0].progress_ring = True
+    pomodoro.start()
+    assert pomodoro.timer.interval() <= 5000
+
+
+def test_pomodoro_resume(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    settings = Settings(resume="true", checkpoint_path=path)
+    pomodoro = Pomodoro(settings)
+    pomodoro.next()
+    pomodoro.next()
+
+    pomodoro2 = Pomodoro(settings)
+    assert pomodoro2.state == State.Running
+    assert pomodoro2.current_task_index == 2
+    assert pomodoro2.finished is False
+    assert pomodoro2.elapsed_minutes() == 0
+
+
+def test_pomodoro_resume_does_not_run_start_command(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    settings = Settings(resume="true", checkpoint_path=path)
+    Pomodoro(settings)
+
+    with patch.object(Pomodoro, "_run_command_start") as run_command_start:
+        Pomodoro(settings)
+        run_command_start.assert_not_called()
+
+
+def test_pomodoro_resume_overtime(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    settings = Settings(resume="true", checkpoint_path=path)
+    Pomodoro(settings)
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["started"] -= 30 * 60
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    with patch.object(Pomodoro, "finish", autospec=True) as finish:
+        pomodoro = Pomodoro(settings)
+        assert pomodoro.elapsed_minutes() == 30
+        assert pomodoro.remaining_minutes() == -5
+        finish.assert_called_once_with(pomodoro)
+
+
+def test_pomodoro_resume_finished_not_run_again(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    settings = Settings(resume="true", checkpoint_path=path)
+    pomodoro = Pomodoro(settings)
+    pomodoro.finish()
+
+    with patch.object(Pomodoro, "finish") as finish:
+        pomodoro2 = Pomodoro(settings)
+        finish.assert_not_called()
+    assert pomodoro2.finished is True
+
+
+def test_pomodoro_resume_stopped(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    settings = Settings(resume="true", checkpoint_path=path)
+    Pomodoro(settings).stop()
+
+    pomodoro = Pomodoro(settings)
+    assert pomodoro.state == State.Stopped
+    assert pomodoro.current_task_index == -1
+
+
+def test_pomodoro_resume_ignores_changed_tasks(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    settings = Settings(resume="true", checkpoint_path=path)
+    pomodoro = Pomodoro(settings)
+    pomodoro.next()
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["task_name"] = "other"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    pomodoro = Pomodoro(settings)
+    assert pomodoro.current_task_index == 0
+
+
+def test_pomodoro_changed_signal():
+    pomodoro = Pomodoro(Settings())
+    events = []
+    pomodoro.changed.connect(events.append)
+
+    pomodoro.next()
+    assert len(events) == 1
+    assert events[0].changed(Change.TASK)
+    assert not events[0].changed(Change.STATE)
+    assert events[0].task_index == 1
@@ -0,0 +1,115 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+from threading import Event
+
+import pytest
+from PySide6.QtCore import QCoreApplication, QThread
+
+from xitomatl.core import State, Task
+from xitomatl.icon import IconRequest
+from xitomatl.render import IconRenderer
+
+
+@pytest.fixture
+def renderer(qapp):
+    renderer = IconRenderer()
+    renderer.delivered = []
+    renderer.frames = []
+
+    def on_icon_rendered(image):
+        renderer.delivered.append((image, QThread.currentThread()))
+
+    renderer.icon_rendered.connect(on_icon_rendered)
+    renderer.frames_ready.connect(lambda *args: renderer.frames.append(args))
+    yield renderer
+    renderer.wait()
+    QCoreApplication.processEvents()
+
+
+def block_worker(renderer):
+    """Keeps the worker thread busy until the returned event is set."""
+    release = Event()
+    renderer.pool.start(release.wait)
+    return release
+
+
+def finish(renderer):
+    renderer.wait()
+    QCoreApplication.processEvents()
+
+
+def request(remaining_minutes=25):
+    return IconRequest(Task(), State.Running, remaining_minutes, 64)
+
+
+def test_render_delivers_in_gui_thread(renderer):
+    req = request()
+    renderer.render(req)
+    renderer.wait()
+    assert renderer.delivered == []
+
+    QCoreApplication.processEvents()
+    assert len(renderer.delivered) == 1
+    image, thread = renderer.delivered[0]
+    assert thread == QCoreApplication.instance().thread()
+    assert image == renderer.render_now(req)
+    assert renderer.frames == [(req.task, [])]
+    assert renderer.pending == {}
+
+
+def test_render_cache_hit_delivers_synchronously(renderer):
+    req = request()
+    renderer.render(req)
+    finish(renderer)
+    assert len(renderer.delivered) == 1
+
+    renderer.render(request())
+    assert len(renderer.delivered) == 2
+    assert renderer.delivered[1][0] == renderer.delivered[0][0]
+    assert renderer.pending == {}
+    assert renderer.wanted_key is None
+
+
+def test_render_skips_requests_no_longer_wanted(renderer):
+    release = block_worker(renderer)
+    old, new = request(25), request(24)
+    renderer.render(old)
+    renderer.render(new)
+    release.set()
+    finish(renderer)
+
+    assert [image for image, _ in renderer.delivered] == [renderer.render_now(new)]
+    assert list(renderer.cache) == [new.key()]
+
+
+def test_render_prefetched_is_not_skipped(renderer):
+    release = block_worker(renderer)
+    prefetched = request(24)
+    renderer.render(request(25))
+    renderer.prefetch(prefetched)
+    release.set()
+    finish(renderer)
+
+    assert len(renderer.delivered) == 1
+    assert set(renderer.cache) == {request(25).key(), prefetched.key()}
+
+
+def test_render_resubmits_job_skipped_before_requested_again(renderer):
+    release = block_worker(renderer)
+    old, new = request(25), request(24)
+    renderer.render(old)
+    renderer.render(new)
+    release.set()
+    # Both jobs finish (the old one skipped) before their results are handled.
+    renderer.wait()
+
+    # Already pending, so this is not submitted until the skipped job returns.
+    renderer.render(old)
+    assert renderer.pool.activeThreadCount() == 0
+
+    QCoreApplication.processEvents()
+    assert renderer.delivered == []
+    assert old.key() in renderer.pending
+
+    finish(renderer)
+    assert [image for image, _ in renderer.delivered] == [renderer.render_now(old)]
+    assert renderer.pending == {}
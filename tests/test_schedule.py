@@ -0,0 +1,176 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+from datetime import datetime
+
+import pytest
+
+from tests.conftest import Settings
+from xitomatl.core import ManualClock
+from xitomatl.core.tasks import Break, Task
+from xitomatl.pomodoro import Pomodoro, State
+from xitomatl.schedule import Schedule, parse_schedule
+
+TASKS = [Task(name="focus", minutes=25), Break(minutes=5), Task(name="standup")]
+DAY = 1000000.0
+HOUR = 3600
+MINUTE = 60
+
+PLAN = """
+# Morning
+09:00 focus
++ break
++ focus
++ break
+10:00 standup 15
++ focus 50
+"""
+
+
+def schedule(text=PLAN, start=DAY):
+    return Schedule(parse_schedule(text.splitlines(), TASKS), DAY, start)
+
+
+def test_schedule_parse():
+    entries = parse_schedule(PLAN.splitlines(), TASKS)
+    assert [e.task.name for e in entries] == [
+        "focus",
+        "break",
+        "focus",
+        "break",
+        "standup",
+        "focus",
+    ]
+    assert entries[0].fixed == 9 * HOUR
+    assert entries[1].fixed is None
+    assert entries[4].task.minutes == 15
+    assert entries[5].task.minutes == 50
+    assert entries[4].task is not TASKS[2]
+    assert TASKS[2].minutes == 25
+    assert [e.task.in_menu for e in entries] == [True, False, False, False, True, False]
+
+
+@pytest.mark.parametrize(
+    "text",
+    (
+        "09:00 unknown",
+        "25:00 focus",
+        "09:00 focus 5 6",
+        "10:00 focus\n09:00 focus",
+        "+ focus five",
+    ),
+)
+def test_schedule_parse_invalid(text):
+    with pytest.raises(ValueError):
+        parse_schedule(text.splitlines(), TASKS)
+
+
+def test_schedule_starts():
+    s = schedule()
+    nine = DAY + 9 * HOUR
+    assert s.starts == [
+        nine,
+        nine + 25 * MINUTE,
+        nine + 30 * MINUTE,
+        nine + 55 * MINUTE,
+        nine + HOUR,
+        nine + HOUR + 15 * MINUTE,
+    ]
+
+
+def test_schedule_lookup():
+    s = schedule()
+    nine = DAY + 9 * HOUR
+    assert s.index_at(nine - 1) == 0
+    assert s.index_at(nine + 10 * MINUTE) == 0
+    assert s.index_at(nine + 25 * MINUTE) == 1
+    assert s.index_at(nine + 5 * HOUR) == 5
+    assert s.next_transition(nine) == nine + 25 * MINUTE
+    assert s.next_transition(nine + 5 * HOUR) == s.next_day_start
+
+
+def test_schedule_roll_over():
+    s = schedule()
+    assert not s.roll_over(s.next_day_start - 1)
+
+    next_day = s.next_day_start
+    assert s.roll_over(next_day + HOUR)
+    assert s.day_start == next_day
+    assert s.starts[0] == next_day + 9 * HOUR
+    assert s.index_at(next_day + 10 * HOUR) == 4
+    assert s.next_day_start > next_day + 22 * HOUR
+
+
+def test_schedule_leading_relative_entries():
+    s = schedule("+ focus\n+ break", start=DAY + 100)
+    assert s.starts == [DAY + 100, DAY + 100 + 25 * MINUTE]
+
+
+def test_schedule_reschedule_after_skip():
+    s = schedule()
+    nine = DAY + 9 * HOUR
+    # Break skipped after 10 minutes of focus.
+    updated = s.reschedule(1, nine + 10 * MINUTE)
+    assert s.starts[1:4] == [
+        nine + 10 * MINUTE,
+        nine + 15 * MINUTE,
+        nine + 40 * MINUTE,
+    ]
+    # Fixed entry does not move so the rest is not regenerated.
+    assert s.starts[4] == nine + HOUR
+    assert updated == 3
+
+
+def test_schedule_reschedule_late_start_is_cut_by_fixed_entry():
+    s = schedule()
+    nine = DAY + 9 * HOUR
+    s.reschedule(2, nine + 50 * MINUTE)
+    assert s.starts[2:5] == [
+        nine + 50 * MINUTE,
+        nine + HOUR,
+        nine + HOUR,
+    ]
+    assert s.index_at(nine + HOUR) == 4
+
+
+def test_schedule_reschedule_keeps_starts_sorted():
+    s = schedule()
+    nine = DAY + 9 * HOUR
+    # Start the last entry early.
+    s.reschedule(5, nine + 5 * MINUTE)
+    assert s.starts == sorted(s.starts)
+    assert s.index_at(nine + 6 * MINUTE) == 5
+
+
+def test_pomodoro_schedule(tmp_path):
+    path = tmp_path / "schedule.txt"
+    path.write_text("00:00 focus\n+ break\n23:59 focus 1\n")
+    noon = (
+        datetime.now().replace(hour=12, minute=0, second=0, microsecond=0).timestamp()
+    )
+    pomodoro = Pomodoro(Settings(schedule=str(path)), wall_clock=ManualClock(noon))
+
+    assert len(pomodoro.tasks) == 3
+    assert pomodoro.state == State.Running
+    assert pomodoro.current_task_index == 1
+
+    expected = noon + (11 * 60 + 59) * 60
+    assert pomodoro.schedule.next_transition(noon) == expected
+    interval = pomodoro.schedule_timer.interval()
+    assert abs(noon + interval / 1000 - expected) < 1
+
+
+def test_pomodoro_schedule_next_day(tmp_path):
+    path = tmp_path / "schedule.txt"
+    path.write_text("00:00 focus\n+ break\n23:59 focus 1\n")
+    late = datetime.now().replace(hour=23, minute=59, second=30).timestamp()
+    wall_clock = ManualClock(late)
+    pomodoro = Pomodoro(Settings(schedule=str(path)), wall_clock=wall_clock)
+    assert pomodoro.current_task_index == 2
+    next_day = pomodoro.schedule.next_day_start
+    assert pomodoro.schedule.next_transition(late) == next_day
+
+    wall_clock.now = next_day + 1
+    pomodoro.on_schedule_timeout()
+
+    assert pomodoro.current_task_index == 0
+    assert pomodoro.schedule.day_start == next_day
+    assert pomodoro.schedule.next_transition(next_day + 1) == next_day + 1 + 25 * MINUTE
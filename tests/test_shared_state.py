@@ -0,0 +1,124 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+import os
+import struct
+import time
+
+import pytest
+
+from tests.conftest import Settings
+from xitomatl.pomodoro import Pomodoro
+from xitomatl.shared_state import (
+    SEQUENCE_OFFSET,
+    STATE_RUNNING,
+    STATE_STOPPED,
+    SharedState,
+    SharedStateReader,
+    SharedStateWriter,
+    default_path,
+    read_state,
+)
+
+
+def test_shared_state_write_read(tmp_path):
+    path = str(tmp_path / "state")
+    writer = SharedStateWriter(path)
+    writer.write(SharedState(2, "break", STATE_RUNNING, 1000.0, 5, False))
+
+    state = read_state(path)
+    assert state.task_index == 2
+    assert state.name == "break"
+    assert state.running
+    assert state.started == 1000.0
+    assert state.minutes == 5
+    assert state.finished is False
+    assert state.sequence == 2
+    assert state.remaining_seconds(now=1060.0) == 240.0
+
+
+def test_shared_state_reader_sees_updates(tmp_path):
+    path = str(tmp_path / "state")
+    writer = SharedStateWriter(path)
+    writer.write(SharedState(0, "focus", STATE_RUNNING, 1000.0, 25, False))
+    reader = SharedStateReader(path)
+    assert reader.read().finished is False
+
+    writer.write(SharedState(0, "focus", STATE_RUNNING, 1000.0, 25, True))
+    state = reader.read()
+    assert state.finished is True
+    assert state.sequence == 4
+
+
+def test_shared_state_reader_retries_while_writing(tmp_path):
+    path = str(tmp_path / "state")
+    writer = SharedStateWriter(path)
+    writer.write(SharedState(0, "focus", STATE_RUNNING, 1000.0, 25, False))
+    struct.pack_into("<Q", writer.map, SEQUENCE_OFFSET, 3)
+
+    assert read_state(path) is None
+
+
+def test_shared_state_continues_sequence(tmp_path):
+    path = str(tmp_path / "state")
+    SharedStateWriter(path).write(
+        SharedState(0, "focus", STATE_RUNNING, 1000.0, 25, False)
+    )
+    SharedStateWriter(path).write(
+        SharedState(-1, "stopped", STATE_STOPPED, 1000.0, 0, False)
+    )
+
+    assert read_state(path).sequence == 4
+
+
+def test_shared_state_invalid_file(tmp_path):
+    path = tmp_path / "state"
+    path.write_bytes(b"\0" * 128)
+
+    with pytest.raises(ValueError):
+        read_state(str(path))
+
+
+def test_pomodoro_shared_state(tmp_path):
+    path = str(tmp_path / "state")
+    pomodoro = Pomodoro(Settings(shared_state="true", shared_state_path=path))
+
+    state = read_state(path)
+    assert state.task_index == 0
+    assert state.name == "focus"
+    assert state.running
+    assert state.minutes == 25
+    assert abs(state.started - time.time()) < 5
+
+    pomodoro.stop()
+    state = read_state(path)
+    assert state.task_index == -1
+    assert not state.running
+
+
+def test_pomodoro_close_shared_state(tmp_path):
+    path = str(tmp_path / "state")
+    pomodoro = Pomodoro(Settings(shared_state="true", shared_state_path=path))
+    pomodoro.close_shared_state()
+
+    state = read_state(path)
+    assert state.task_index == -1
+    assert not state.running
+    assert pomodoro.shared_state is None
+
+
+def test_shared_state_default_path_per_user(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert default_path() == str(tmp_path / "xitomatl.state")
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert os.path.basename(default_path()) == f"xitomatl-{os.getuid()}.state"
+
+
+def test_shared_state_does_not_follow_symlink(tmp_path):
+    target = tmp_path / "target"
+    target.write_bytes(b"keep")
+    path = tmp_path / "state"
+    path.symlink_to(target)
+
+    with pytest.raises(OSError):
+        SharedStateWriter(str(path))
+    assert target.read_bytes() == b"keep"
@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+import fcntl
+import json
+import os
+
+import pytest
+
+from tests.conftest import Settings
+from xitomatl.pomodoro import Pomodoro
+from xitomatl.status import StatusStream, open_fifo, status
+
+
+def test_status_running():
+    pomodoro = Pomodoro(Settings())
+
+    data = status(pomodoro)
+    assert data["text"] == str(pomodoro)
+    assert data["class"] == "normal"
+    assert data["state"] == "running"
+    assert data["task"] == "focus"
+    assert data["task_index"] == 0
+    assert data["remaining_minutes"] == 25
+    assert data["percentage"] == 0
+
+
+def test_status_timed_out():
+    pomodoro = Pomodoro(Settings())
+    pomodoro.tasks[0].minutes = 0
+
+    assert status(pomodoro)["class"] == "timed-out"
+
+
+def test_status_stopped():
+    pomodoro = Pomodoro(Settings(autostart="0"))
+
+    data = status(pomodoro)
+    assert data["class"] == "stopped"
+    assert data["state"] == "stopped"
+
+
+@pytest.fixture
+def pipe():
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    os.set_blocking(write_fd, False)
+    # Smallest pipe buffer so it can be filled quickly.
+    fcntl.fcntl(write_fd, fcntl.F_SETPIPE_SZ, 4096)
+    yield read_fd, write_fd
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+def read_all(fd):
+    data = b""
+    try:
+        while chunk := os.read(fd, 65536):
+            data += chunk
+    except BlockingIOError:
+        pass
+    return data
+
+
+def test_status_stream_writes_only_changes(pipe):
+    read_fd, write_fd = pipe
+    pomodoro = Pomodoro(Settings())
+    stream = StatusStream(write_fd)
+
+    stream.update(pomodoro)
+    stream.update(pomodoro)
+    pomodoro.next()
+    stream.update(pomodoro)
+
+    lines = read_all(read_fd).decode().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["task"] == "focus"
+    assert json.loads(lines[1])["task"] == "break"
+
+
+def test_status_stream_fifo(tmp_path):
+    path = str(tmp_path / "status")
+    pomodoro = Pomodoro(Settings())
+    stream = StatusStream(open_fifo(path))
+    stream.update(pomodoro)
+
+    fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        line = os.read(fd, 4096).decode()
+    finally:
+        os.close(fd)
+    assert json.loads(line)["text"] == str(pomodoro)
+
+
+def test_status_stream_retries_when_full(pipe):
+    read_fd, write_fd = pipe
+    pomodoro = Pomodoro(Settings())
+    stream = StatusStream(write_fd)
+    os.write(write_fd, b"x" * 4000)
+
+    stream.update(pomodoro)
+    assert stream.last_line is None
+
+    assert read_all(read_fd) == b"x" * 4000
+    assert stream.flush()
+    assert json.loads(read_all(read_fd))["task"] == "focus"
+    assert stream.last_line is not None
+
+
+def test_status_stream_keeps_lines_whole(pipe):
+    read_fd, write_fd = pipe
+    pomodoro = Pomodoro(Settings())
+    for task in pomodoro.tasks:
+        task.name = "x" * 3000
+    stream = StatusStream(write_fd)
+
+    # The line is longer than the pipe buffer.
+    stream.update(pomodoro)
+    data = read_all(read_fd)
+    pomodoro.next()
+    stream.update(pomodoro)
+    pomodoro.next()
+    stream.update(pomodoro)
+    while not stream.flush():
+        data += read_all(read_fd)
+    data += read_all(read_fd)
+
+    lines = data.decode().splitlines()
+    assert [json.loads(line)["task_index"] for line in lines] == [0, 2]
@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+from enum import Enum
+
+import pytest
+
+from xitomatl.core import ManualClock
+from xitomatl.trace import (
+    EVENT_ACTIVATED,
+    EVENT_MENU_TASK,
+    EVENT_TIMER,
+    Trace,
+    TraceRecord,
+    TraceWriter,
+    read_trace,
+    traced,
+)
+
+
+class Reason(Enum):
+    Trigger = 3
+
+
+def test_trace_round_trip(tmp_path, clock):
+    path = tmp_path / "test.trace"
+    trace = TraceWriter(path, clock=clock, wall_clock=ManualClock(1000.0))
+    calls = []
+
+    def on_activated(reason):
+        calls.append(reason)
+        clock.now += 0.25
+
+    traced(trace, EVENT_ACTIVATED, on_activated)(Reason.Trigger)
+    clock.now += 1
+    traced(trace, EVENT_MENU_TASK, lambda: calls.append(2), arg=2)()
+    trace.close()
+
+    assert calls == [Reason.Trigger, 2]
+    assert read_trace(path) == Trace(
+        1000.0,
+        [
+            TraceRecord(0.0, 0.25, EVENT_ACTIVATED, 3),
+            TraceRecord(1.25, 0.0, EVENT_MENU_TASK, 2),
+        ],
+    )
+
+
+def test_traced_without_trace():
+    handler = object()
+    assert traced(None, EVENT_TIMER, handler) is handler
+
+
+def test_trace_records_failed_handler(tmp_path, clock):
+    path = tmp_path / "test.trace"
+    trace = TraceWriter(path, clock=clock)
+
+    def fail():
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        traced(trace, EVENT_TIMER, fail)()
+    trace.close()
+
+    assert [r.event for r in read_trace(path).records] == [EVENT_TIMER]
+
+
+def test_read_trace_ignores_incomplete_record(tmp_path, clock):
+    path = tmp_path / "test.trace"
+    trace = TraceWriter(path, clock=clock)
+    traced(trace, EVENT_TIMER, lambda: None)()
+    trace.close()
+
+    with open(path, "ab") as f:
+        f.write(b"\0\0\0")
+
+    assert len(read_trace(path).records) == 1
+
+
+def test_read_trace_invalid(tmp_path):
+    path = tmp_path / "test.trace"
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        read_trace(path)
@@ -11,8 +11,8 @@ import sys
 from PySide6.QtCore import QCoreApplication, QSettings
 
 from xitomatl import __version__
-from xitomatl.app import App
 from xitomatl.log import APP_ID, init_debug_logging, init_logging, log
+from xitomatl.status import StatusStream
 
 
 def parse_args():
@@ -33,7 +33,37 @@ def parse_args():
         action="store_true",
         help="print debug information",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--status-stream",
+        nargs="?",
+        const="-",
+        metavar="FIFO",
+        help=(
+            "write JSON status line on each change to standard output"
+            " or to a named pipe (for example, for waybar custom module)"
+        ),
+    )
+    parser.add_argument(
+        "--headless",
+        default=False,
+        action="store_true",
+        help=(
+            "run without tray icon, controlled with signals"
+            " and commands on standard input"
+        ),
+    )
+    parser.add_argument(
+        "--record-trace",
+        metavar="FILE",
+        help=(
+            "record input events and timer firings with timestamps"
+            " to a file (see replay.py)"
+        ),
+    )
+    args = parser.parse_args()
+    if args.headless and args.record_trace:
+        parser.error("--record-trace is not supported in headless mode")
+    return args
 
 
 def create_app():
@@ -58,7 +88,28 @@ def create_app():
 
     log.debug("Config: %s", settings.fileName())
 
-    return App(sys.argv, settings)
+    status_stream = None
+    if args.status_stream:
+        try:
+            status_stream = StatusStream.open(args.status_stream)
+        except (OSError, ValueError) as e:
+            log.error("Failed to open status stream: %s", e)
+
+    # Avoid importing QtGui and QtWidgets in headless mode.
+    # pylint: disable=import-outside-toplevel
+    if args.headless:
+        from xitomatl.headless import Headless
+
+        return Headless(sys.argv, settings, status_stream)
+
+    from xitomatl.app import App
+    from xitomatl.trace import TraceWriter
+
+    trace = None
+    if args.record_trace:
+        trace = TraceWriter(args.record_trace)
+
+    return App(sys.argv, settings, status_stream, trace)
 
 
 def main():
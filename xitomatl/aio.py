@@ -0,0 +1,240 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Pomodoro timer driven by an asyncio event loop.
+
+Timers only hold callbacks scheduled on the loop and run hook commands as
+subprocesses of the loop, so a single thread can drive many timers:
+
+    async with AsyncTimer(settings) as timer:
+        await timer.start()
+        async for event in timer.events():
+            ...
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import replace
+from subprocess import CalledProcessError  # nosec B404
+
+from xitomatl.core import pomodoro as core
+from xitomatl.core.pomodoro import record_hook, split_command
+from xitomatl.log import log
+
+# Events queued for each consumer of AsyncTimer.events() before merging them.
+DEFAULT_MAX_QUEUED_EVENTS = 16
+
+_CLOSED = object()
+
+
+async def run_hook(command, hook=""):
+    """Runs lines of a hook command in order without blocking the loop."""
+    for args in split_command(command):
+        start = time.monotonic()
+        code = "error"
+        try:
+            process = await asyncio.create_subprocess_exec(*args)
+            code = await process.wait()
+        finally:
+            record_hook(hook, start, code)
+        if code != 0:
+            raise CalledProcessError(code, args)
+
+
+class EventStream:
+    """
+    Async iterator over ChangeEvent returned by AsyncTimer.events().
+
+    If the consumer falls behind by max_size events, newer events are merged
+    into the last queued one, which then carries all the changes and the
+    latest values.
+    """
+
+    def __init__(self, pomodoro, max_size):
+        self.pomodoro = pomodoro
+        self.max_size = max_size
+        self.events = deque()
+        self.ready = asyncio.Event()
+        self.put(pomodoro.change_event())
+        pomodoro.listeners.append(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self.events:
+            self.ready.clear()
+            await self.ready.wait()
+
+        event = self.events.popleft()
+        if event is _CLOSED:
+            self.events.append(_CLOSED)
+            raise StopAsyncIteration
+        return event
+
+    def put(self, event):
+        if self.events and self.events[-1] is _CLOSED:
+            return
+        if len(self.events) >= self.max_size:
+            last = self.events.pop()
+            event = replace(event, changes=last.changes | event.changes)
+        self.events.append(event)
+        self.ready.set()
+
+    def close(self):
+        """Stops receiving events and ends the iteration."""
+        if self in self.pomodoro.listeners:
+            self.pomodoro.listeners.remove(self)
+        self.events.append(_CLOSED)
+        self.ready.set()
+
+
+class Pomodoro(core.Pomodoro):
+    def __init__(self, settings, loop=None, **kwargs):
+        self.loop = loop or asyncio.get_running_loop()
+        self.closed = False
+        self.timer = None
+        self.schedule_timer = None
+        self.listeners = []
+        # Hook commands waiting to run as (command, hook, future)
+        self.commands = deque()
+        self.command_runner = None
+        # Collects futures of commands queued by the current action.
+        self.command_futures = None
+
+        kwargs.setdefault("clock", self.loop.time)
+        super().__init__(settings, **kwargs)
+
+    def on_timeout(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+        if self.closed:
+            return
+
+        interval, _ = self.update()
+        if interval is None:
+            return
+
+        log.debug("Scheduling next update in %s ms", interval)
+        self.timer = self.loop.call_later(interval / 1000, self.on_timeout)
+
+    def close(self):
+        self.closed = True
+        self.close_shared_state()
+        self._stop_schedule_timer()
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        for listener in list(self.listeners):
+            listener.close()
+
+    def _notify(self):
+        self.on_timeout()
+
+    def _emit_change(self, event):
+        for listener in self.listeners:
+            listener.put(event)
+
+    def _start_schedule_timer(self, interval):
+        self.schedule_timer = self.loop.call_later(
+            interval / 1000, self.on_schedule_timeout
+        )
+
+    def _stop_schedule_timer(self):
+        if self.schedule_timer:
+            self.schedule_timer.cancel()
+            self.schedule_timer = None
+
+    def _run_command_start(self):
+        self._queue_command(self.current_task().command_start, "start")
+
+    def _run_command_stop(self):
+        self._queue_command(self.current_task().command_stop, "stop")
+
+    def _run_command_finish(self):
+        self._queue_command(self.current_task().command_finish, "finish")
+
+    def _queue_command(self, command, hook):
+        future = self.loop.create_future()
+        self.commands.append((command, hook, future))
+        if self.command_futures is not None:
+            self.command_futures.append(future)
+        if self.command_runner is None:
+            self.command_runner = self.loop.create_task(self._run_commands())
+
+    async def _run_commands(self):
+        try:
+            while self.commands:
+                command, hook, future = self.commands.popleft()
+                error = None
+                try:
+                    await run_hook(command, hook)
+                except (OSError, ValueError, CalledProcessError) as e:
+                    # ValueError is raised for a malformed command line.
+                    log.exception("Failed to run %s command", hook)
+                    error = e
+                # Errors are passed as results to avoid warnings about
+                # exceptions never retrieved from commands started by the timer.
+                future.set_result(error)
+        finally:
+            self.command_runner = None
+
+
+class AsyncTimer:
+    """
+    Pomodoro timer for asyncio applications.
+
+    Must be created while the loop is running. Actions return after the hook
+    commands they triggered finished and raise if any of the commands failed.
+    """
+
+    def __init__(self, settings, max_queued_events=DEFAULT_MAX_QUEUED_EVENTS, **kwargs):
+        self.max_queued_events = max_queued_events
+        self.pomodoro = Pomodoro(settings, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        await self.aclose()
+
+    async def start(self):
+        await self._act(self.pomodoro.start)
+
+    async def next(self):
+        await self._act(self.pomodoro.next)
+
+    async def stop(self):
+        await self._act(self.pomodoro.stop)
+
+    async def start_task(self, index):
+        await self._act(self.pomodoro.start_task, index)
+
+    def events(self):
+        """
+        Returns EventStream with the current state and then with each change.
+
+        Close the stream if it is no longer consumed before the timer closes.
+        """
+        return EventStream(self.pomodoro, self.max_queued_events)
+
+    async def aclose(self):
+        """Stops updates, ends event streams and waits for hook commands."""
+        self.pomodoro.close()
+        runner = self.pomodoro.command_runner
+        if runner:
+            await asyncio.wait([runner])
+
+    async def _act(self, action, *args):
+        futures = []
+        self.pomodoro.command_futures = futures
+        try:
+            action(*args)
+        finally:
+            self.pomodoro.command_futures = None
+
+        for error in await asyncio.gather(*futures):
+            if error:
+                raise error
@@ -1,26 +1,132 @@
 # SPDX-License-Identifier: LGPL-2.0-or-later
 from PySide6.QtCore import (
+    SLOT,
     QEasingCurve,
     QObject,
     Qt,
     QTimer,
     QVariantAnimation,
     Signal,
+    Slot,
 )
 from PySide6.QtGui import (
     QColor,
     QIcon,
+    QImage,
     QLinearGradient,
     QPainter,
     QPixmap,
     QTransform,
 )
 
+try:
+    from PySide6.QtDBus import (
+        QDBusConnection,
+        QDBusMessage,
+        QDBusPendingCallWatcher,
+    )
+except ImportError:
+    QDBusConnection = None
+
+from xitomatl.attention import AttentionPolicy
+from xitomatl.log import log
+from xitomatl.metrics import metrics
+from xitomatl.trace import EVENT_ANIMATION_TIMER, traced
+
+LOGIND_SERVICE = "org.freedesktop.login1"
+LOGIND_MANAGER_PATH = "/org/freedesktop/login1"
+LOGIND_MANAGER_INTERFACE = "org.freedesktop.login1.Manager"
+LOGIND_SESSION_INTERFACE = "org.freedesktop.login1.Session"
+DBUS_PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+DBUS_TIMEOUT_MS = 1000
+
+
+def _unwrap(value):
+    if hasattr(value, "variant"):
+        return value.variant()
+    return value.path() if hasattr(value, "path") else value
+
+
+class SessionIdleMonitor(QObject):
+    """
+    Tracks IdleHint of the current logind session.
+
+    The calls to logind are asynchronous and the value is read again on
+    PropertiesChanged signal, so reading idle never blocks.
+    """
+
+    def __init__(self, bus=None):
+        super().__init__()
+        self.idle = False
+        self.session_path = None
+        self.bus = bus
+        if self.bus is None and QDBusConnection is not None:
+            self.bus = QDBusConnection.systemBus()
+        if self.bus is None or not self.bus.isConnected():
+            return
+
+        message = QDBusMessage.createMethodCall(
+            LOGIND_SERVICE,
+            LOGIND_MANAGER_PATH,
+            LOGIND_MANAGER_INTERFACE,
+            "GetSession",
+        )
+        message.setArguments(["auto"])
+        self._call(message, self._on_session)
+
+    def _call(self, message, callback):
+        call = self.bus.asyncCall(message, DBUS_TIMEOUT_MS)
+        watcher = QDBusPendingCallWatcher(call, self)
+        watcher.finished.connect(callback)
+
+    def _reply(self, watcher):
+        watcher.deleteLater()
+        reply = watcher.reply()
+        if reply.type() != QDBusMessage.MessageType.ReplyMessage:
+            log.debug("No idle state from logind: %s", reply.errorMessage())
+            return None
+        return _unwrap(reply.arguments()[0])
+
+    def _on_session(self, watcher):
+        path = self._reply(watcher)
+        if path is None:
+            return
+
+        self.session_path = path
+        self.bus.connect(
+            LOGIND_SERVICE,
+            self.session_path,
+            DBUS_PROPERTIES_INTERFACE,
+            "PropertiesChanged",
+            self,
+            SLOT("_on_properties_changed(QDBusMessage)"),
+        )
+        self._refresh()
+
+    def _refresh(self):
+        message = QDBusMessage.createMethodCall(
+            LOGIND_SERVICE, self.session_path, DBUS_PROPERTIES_INTERFACE, "Get"
+        )
+        message.setArguments([LOGIND_SESSION_INTERFACE, "IdleHint"])
+        self._call(message, self._on_idle_hint)
+
+    def _on_idle_hint(self, watcher):
+        value = self._reply(watcher)
+        if value is not None:
+            self.idle = bool(value)
+
+    @Slot(QDBusMessage)
+    def _on_properties_changed(self, message):
+        # Changed values are not unmarshalled by PySide, so read IdleHint
+        # again (the session properties change rarely).
+        if message.arguments()[0] == LOGIND_SESSION_INTERFACE:
+            self._refresh()
+
 
 class NotifyAnimation(QObject):
     icon_changed = Signal(QIcon)
 
-    def __init__(self):
+    def __init__(self, trace=None):
         super().__init__()
         self.rotation = 0.0
         self.running = False
@@ -49,32 +155,57 @@ class NotifyAnimation(QObject):
 
         self.timer = QTimer()
         self.timer.setSingleShot(True)
-        self.timer.setInterval(20000)
+        self.timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+
+        self.policy = AttentionPolicy()
+        self.idle_monitor = None
+        # Frames emitted by the current animation
+        self.frames = 0
 
         self.anim1.finished.connect(self.anim2.start)
-        self.anim2.finished.connect(self.timer.start)
-        self.timer.timeout.connect(self._loop)
+        self.anim2.finished.connect(self._on_finished)
+        self.timer.timeout.connect(traced(trace, EVENT_ANIMATION_TIMER, self._loop))
 
-        self.icon = QPixmap()
+        self.icon = QImage()
 
     @property
     def interval(self):
-        return self.timer.interval()
+        """Milliseconds until the next repeated animation."""
+        return int(self.policy.next_interval() * 1000)
 
     @interval.setter
     def interval(self, milliseconds):
-        self.timer.setInterval(milliseconds)
+        self.policy.current_interval = milliseconds / 1000
+
+    def start(self, policy=None):
+        """Starts repeating animation (if not running) with given policy."""
+        if self.running:
+            return
 
-    def start(self):
         self.running = True
+        self.policy = policy or AttentionPolicy()
+        if self.policy.settings.idle_pause and self.idle_monitor is None:
+            self.idle_monitor = SessionIdleMonitor()
         self.once()
 
     def stop(self):
+        if not self.running:
+            return
+
         self.running = False
+        self.timer.stop()
+        saved = int(self.policy.saved_frames)
+        if saved > 0:
+            log.info("Overtime animation saved %s frames", saved)
+            metrics.inc("xitomatl_animation_frames_saved_total", saved)
+
+    def user_activity(self):
+        self.policy.user_activity()
 
     def once(self):
         self.timer.stop()
         self.anim2.stop()
+        self.frames = 0
         self.anim1.setStartValue(self.rotation)
         self.anim1.start()
 
@@ -84,6 +215,8 @@ class NotifyAnimation(QObject):
 
     def set_rotation(self, value):
         self.rotation = value
+        self.frames += 1
+        metrics.inc("xitomatl_animation_frames_total")
         self.update_icon()
 
     def update_icon(self):
@@ -93,7 +226,7 @@ class NotifyAnimation(QObject):
             transform, Qt.TransformationMode.SmoothTransformation
         )
         self._flash(icon)
-        self.icon_changed.emit(QIcon(icon))
+        self.icon_changed.emit(QIcon(QPixmap.fromImage(icon)))
 
     def _flash(self, icon):
         time = self.anim1.currentTime() + self.anim2.currentTime()
@@ -118,6 +251,20 @@ class NotifyAnimation(QObject):
         painter.fillRect(area, gradient)
         painter.end()
 
-    def _loop(self):
+    def _on_finished(self):
         if self.running:
+            self.policy.record(self.frames)
+            self._schedule()
+
+    def _schedule(self):
+        self.timer.start(int(self.policy.next_interval() * 1000))
+
+    def _loop(self):
+        if not self.running:
+            return
+
+        idle = self.idle_monitor is not None and self.idle_monitor.idle
+        if self.policy.should_animate(idle=idle):
             self.once()
+        else:
+            self._schedule()
@@ -1,70 +1,114 @@
 # SPDX-License-Identifier: LGPL-2.0-or-later
 from bisect import bisect_left
+from dataclasses import replace
 from functools import partial
 
 from PySide6.QtCore import QTimer
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QIcon, QPixmap
 from PySide6.QtWidgets import QApplication, QMenu, QSystemTrayIcon
 
 from xitomatl.animation import NotifyAnimation
-from xitomatl.icon import task_icon
+from xitomatl.attention import AttentionPolicy
+from xitomatl.core.events import Change
+from xitomatl.icon import IconRequest, task_icon
+from xitomatl.metrics_server import serve_metrics_from_settings
 from xitomatl.pomodoro import Pomodoro, State
+from xitomatl.render import IconRenderer
+from xitomatl.trace import (
+    EVENT_ACTIVATED,
+    EVENT_CLICK_TIMER,
+    EVENT_FRAME_TIMER,
+    EVENT_MENU_NEXT,
+    EVENT_MENU_START,
+    EVENT_MENU_STOP,
+    EVENT_MENU_TASK,
+    traced,
+)
 
 DEFAULT_ICON_SIZE = 64
 DEFAULT_DOUBLE_CLICK_INTERVAL_MS = 100
 PROPERTY_INDEX = "xitomatl_task_index"
 
 
-def add_task_actions(menu, pomodoro, icon_size):
+def add_task_actions(menu, pomodoro, icon_size, trace=None):
     actions = {}
     for index, task in ((i, t) for i, t in enumerate(pomodoro.tasks) if t.in_menu):
         text = f"&{index + 1}. {task}"
-        act = menu.addAction(text, partial(pomodoro.start_task, index))
+        start_task = partial(pomodoro.start_task, index)
+        act = menu.addAction(
+            text, traced(trace, EVENT_MENU_TASK, start_task, arg=index)
+        )
         icon = task_icon(task, State.Running, task.minutes, icon_size)
-        act.setIcon(icon)
+        act.setIcon(QIcon(QPixmap.fromImage(icon)))
         actions[index] = act
 
     return actions
 
 
 class App:
-    def __init__(self, argv, settings):
+    def __init__(self, argv, settings, status_stream=None, trace=None, **kwargs):
         self.app = QApplication(argv)
 
-        self.pomodoro = Pomodoro(settings)
-        self.pomodoro.state_changed.connect(self.on_state_changed)
+        self.status_stream = status_stream
+        self.trace = trace
+        # Clocks can be passed in kwargs, see core Pomodoro.
+        self.pomodoro = Pomodoro(settings, trace=trace, **kwargs)
+        self.metrics_server = serve_metrics_from_settings(settings)
+        self.pomodoro.changed.connect(self.on_changed)
 
         self.icon = QSystemTrayIcon()
-        self.icon.activated.connect(self.on_activated)
+        self.icon.activated.connect(traced(trace, EVENT_ACTIVATED, self.on_activated))
 
         self.icon_size = int(settings.value("icon_size", DEFAULT_ICON_SIZE))
 
-        self.animation = NotifyAnimation()
+        self.renderer = IconRenderer()
+
+        self.animation = NotifyAnimation(trace)
         self.animation.icon_changed.connect(self.icon.setIcon)
+        self.renderer.icon_rendered.connect(self.animation.set_icon)
+        self.renderer.frames_ready.connect(self.on_frames_ready)
 
         menu = QMenu()
         menu.addAction(
             QIcon.fromTheme("media-playback-start"),
             "&Start",
-            self.pomodoro.start,
+            traced(trace, EVENT_MENU_START, self.pomodoro.start, arg=0),
         )
         menu.addAction(
-            QIcon.fromTheme("media-skip-forward"), "&Next", self.pomodoro.next
+            QIcon.fromTheme("media-skip-forward"),
+            "&Next",
+            traced(trace, EVENT_MENU_NEXT, self.pomodoro.next, arg=0),
         )
         menu.addAction(
-            QIcon.fromTheme("media-playback-stop"), "&Stop", self.pomodoro.stop
+            QIcon.fromTheme("media-playback-stop"),
+            "&Stop",
+            traced(trace, EVENT_MENU_STOP, self.pomodoro.stop, arg=0),
         )
         menu.addSeparator()
-        self.task_actions = add_task_actions(menu, self.pomodoro, self.icon_size)
+        self.task_actions = add_task_actions(menu, self.pomodoro, self.icon_size, trace)
         self.task_index_list = list(self.task_actions.keys())
         menu.addSeparator()
+        self.summary_action = menu.addAction("")
+        self.summary_action.setEnabled(False)
+        self.summary_action.setVisible(False)
         menu.addAction(QIcon.fromTheme("application-exit"), "&Quit", self.app.quit)
         self.icon.setContextMenu(menu)
 
         self.current_task_index = -2
         self.current_action = None
 
-        self.on_state_changed()
+        # Playback of animated task image
+        self.frame = 0
+        self.frame_delays = []
+        self.frame_task = None
+        self.frame_timer = QTimer()
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(
+            traced(trace, EVENT_FRAME_TIMER, self.on_frame_timeout)
+        )
+
+        self.on_changed(self.pomodoro.change_event())
+        self.animation.set_icon(self.renderer.render_now(self.icon_request()))
         self.icon.show()
 
         # Workaround for interpreting double clicks on tray icon as three
@@ -75,9 +119,12 @@ class App:
         )
         self.click_timer.setSingleShot(True)
         self.click_timer.setInterval(double_click_interval_ms)
-        self.click_timer.timeout.connect(self.on_icon_single_click)
+        self.click_timer.timeout.connect(
+            traced(trace, EVENT_CLICK_TIMER, self.on_icon_single_click)
+        )
 
     def on_activated(self, reason):
+        self.animation.user_activity()
         if reason == QSystemTrayIcon.ActivationReason.Trigger:
             self.click_timer.start()
         elif reason == QSystemTrayIcon.ActivationReason.MiddleClick:
@@ -92,36 +139,123 @@ class App:
     def on_icon_middle_click(self):
         self.pomodoro.stop()
 
-    def on_state_changed(self):
+    def icon_request(self):
         task = self.pomodoro.current_task()
-        remaining = self.pomodoro.remaining_minutes()
-        icon = task_icon(
+        return IconRequest(
             task,
             self.pomodoro.state,
-            remaining,
+            self.pomodoro.remaining_minutes(),
             self.icon_size,
+            countdown_seconds=(
+                self.pomodoro.remaining_seconds()
+                if self.pomodoro.is_countdown()
+                else None
+            ),
+            progress=self.pomodoro.progress() if task.progress_ring else None,
+            frame=self.frame,
         )
 
-        self.animation.set_icon(icon)
-        if task.animated and remaining <= 0:
-            self.animation.start()
-        else:
-            self.animation.stop()
+    def update_frames(self):
+        """Stops playing frames of the previous task."""
+        task = self.pomodoro.current_task()
+        if task is self.frame_task:
+            return
 
-        self.icon.setToolTip(f"{QApplication.applicationName()}: {self.pomodoro}")
+        self.frame_task = task
+        self.frame = 0
+        self.frame_delays = []
+        self.frame_timer.stop()
 
-        if self.current_task_index != self.pomodoro.current_task_index:
-            if self.current_action:
-                self.current_action.setText(
-                    self.current_action.text().split(maxsplit=1)[-1]
+    def on_frames_ready(self, task, delays):
+        """Starts playing frames once the animated task image is rendered."""
+        if task is not self.frame_task or self.frame_delays or not delays:
+            return
+
+        self.frame_delays = delays
+        self.frame_timer.start(delays[self.frame])
+
+    def on_frame_timeout(self):
+        self.frame = (self.frame + 1) % len(self.frame_delays)
+        request = self.icon_request()
+        self.renderer.render(request)
+        self.renderer.prefetch(
+            replace(request, frame=(self.frame + 1) % len(self.frame_delays))
+        )
+        self.frame_timer.start(self.frame_delays[self.frame])
+
+    def prefetch_icons(self):
+        """Render icons for the next minute and the next task in advance."""
+        if self.pomodoro.state != State.Running:
+            return
+
+        task = self.pomodoro.current_task()
+        if not task.progress_ring and not self.frame_delays:
+            self.renderer.prefetch(
+                IconRequest(
+                    task,
+                    State.Running,
+                    self.pomodoro.remaining_minutes() - 1,
+                    self.icon_size,
                 )
+            )
 
-            self.current_task_index = self.pomodoro.current_task_index
-            i = bisect_left(
-                self.task_index_list,
-                self.current_task_index,
+        index = (self.pomodoro.current_task_index + 1) % len(self.pomodoro.tasks)
+        next_task = self.pomodoro.tasks[index]
+        self.renderer.prefetch(
+            IconRequest(
+                next_task,
+                State.Running,
+                next_task.minutes,
+                self.icon_size,
+                progress=0.0 if next_task.progress_ring else None,
             )
-            i = self.task_index_list[i % len(self.pomodoro.tasks)]
+        )
+
+    def on_changed(self, event):
+        if event.changed(Change.ICON):
+            self.update_frames()
+            self.renderer.render(self.icon_request())
+            self.prefetch_icons()
+
+        if event.changed(Change.TASK | Change.STATE | Change.TIMED_OUT):
+            self.update_animation(event)
+
+        if event.changed(Change.TASK | Change.STATE | Change.MINUTE | Change.TIMED_OUT):
+            self.update_status()
+
+        if event.changed(Change.TASK):
+            self.update_task_actions()
+
+    def update_animation(self, event):
+        task = self.pomodoro.current_task()
+        if task.animated and event.timed_out:
+            self.animation.start(AttentionPolicy.from_task(task))
+        else:
+            self.animation.stop()
+
+    def update_status(self):
+        tooltip = f"{QApplication.applicationName()}: {self.pomodoro}"
+        summary = self.pomodoro.summary()
+        if summary:
+            tooltip += f"\n{summary}"
+        self.icon.setToolTip(tooltip)
+        self.summary_action.setText(summary)
+        self.summary_action.setVisible(bool(summary))
+        if self.status_stream:
+            self.status_stream.update(self.pomodoro)
+
+    def update_task_actions(self):
+        if self.current_action:
+            self.current_action.setText(
+                self.current_action.text().split(maxsplit=1)[-1]
+            )
+
+        self.current_task_index = self.pomodoro.current_task_index
+        self.current_action = None
+        if self.task_index_list:
+            i = bisect_left(self.task_index_list, self.current_task_index)
+            # Wrap around to the first menu task after the last one.
+            i = self.task_index_list[i % len(self.task_index_list)]
             act = self.task_actions[i]
             if i == self.current_task_index:
                 act.setText(f"▶ {act.text()}")
@@ -129,7 +263,12 @@ class App:
                 act.setText(f"⏸ {act.text()}")
             self.current_action = act
 
-            self.animation.once()
+        self.animation.once()
 
     def exec(self):
-        return self.app.exec()
+        try:
+            return self.app.exec()
+        finally:
+            self.pomodoro.close_shared_state()
+            if self.trace:
+                self.trace.close()
@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Policy for repeating the animation while a task is in overtime.
+
+The interval between animations grows (backoff) up to a maximum, the number
+of animated frames per hour is capped and the animation is paused while the
+session is idle or shortly after the user clicked the icon.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+
+HOUR_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class AttentionSettings:
+    # Seconds between animations initially and at most
+    interval: float = 20
+    backoff: float = 1.5
+    max_interval: float = 600
+    frames_per_hour: int = 1500
+    # Seconds without animation after user activity
+    click_pause: float = 60
+    idle_pause: bool = True
+
+    @classmethod
+    def from_task(cls, task):
+        return cls(
+            interval=task.animation_interval,
+            backoff=task.animation_backoff,
+            max_interval=task.animation_max_interval,
+            frames_per_hour=task.animation_frames_per_hour,
+            click_pause=task.animation_click_pause,
+            idle_pause=task.animation_idle_pause,
+        )
+
+
+class AttentionPolicy:
+    def __init__(self, settings=None, clock=time.monotonic):
+        self.settings = settings or AttentionSettings()
+        self.clock = clock
+
+        self.current_interval = self.settings.interval
+        self.paused_until = 0.0
+        self.last_check = clock()
+        # Frames of animations in the last hour as (time, frames)
+        self.history = deque()
+        self.frames_in_hour = 0
+        self.frames_per_animation = 0
+        # Frames saved compared to animating every initial interval
+        self.saved_frames = 0.0
+
+    @classmethod
+    def from_task(cls, task, clock=time.monotonic):
+        return cls(AttentionSettings.from_task(task), clock)
+
+    def next_interval(self):
+        """Returns seconds until should_animate() should be called."""
+        return self.current_interval
+
+    def user_activity(self):
+        self.paused_until = self.clock() + self.settings.click_pause
+
+    def record(self, frames):
+        """Records number of frames rendered by a finished animation."""
+        now = self.clock()
+        self._expire(now)
+        self.history.append((now, frames))
+        self.frames_in_hour += frames
+        self.frames_per_animation = frames
+
+    def should_animate(self, idle=False):
+        """
+        Returns True if the animation should run now.
+
+        Called after the interval from next_interval() passed.
+        """
+        settings = self.settings
+        now = self.clock()
+        self._expire(now)
+
+        frames = self.frames_in_hour + self.frames_per_animation
+        animate = (
+            now >= self.paused_until
+            and not (settings.idle_pause and idle)
+            and frames <= settings.frames_per_hour
+        )
+
+        if settings.interval > 0:
+            would_animate = (now - self.last_check) / settings.interval
+            self.saved_frames += (
+                max(0.0, would_animate - animate) * self.frames_per_animation
+            )
+        self.last_check = now
+        self.current_interval = min(
+            self.current_interval * settings.backoff, settings.max_interval
+        )
+        return animate
+
+    def _expire(self, now):
+        while self.history and self.history[0][0] <= now - HOUR_SECONDS:
+            _, frames = self.history.popleft()
+            self.frames_in_hour -= frames
@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Checkpoint of the running task so it can be resumed after restart.
+"""
+
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+
+from xitomatl.log import log
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FILE_NAME = "checkpoint.json"
+
+
+@dataclass
+class Checkpoint:
+    task_index: int
+    task_name: str
+    state: int
+    # Wall-clock time the task started (seconds since epoch)
+    started: float
+    finished: bool
+
+
+def save_checkpoint(path, checkpoint):
+    """Write checkpoint atomically (write to temporary file and rename)."""
+    data = {"version": CHECKPOINT_VERSION, **asdict(checkpoint)}
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        log.exception("Failed to read checkpoint %s", path)
+        return None
+
+    if not isinstance(data, dict) or data.pop("version", None) != CHECKPOINT_VERSION:
+        log.warning("Ignoring checkpoint with unsupported version: %s", path)
+        return None
+
+    try:
+        return Checkpoint(**data)
+    except TypeError:
+        log.warning("Ignoring invalid checkpoint: %s", path)
+        return None
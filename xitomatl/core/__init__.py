@@ -0,0 +1,23 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Task model, configuration parsing and timer state machine without Qt.
+"""
+
+from xitomatl.core.clock import ManualClock
+from xitomatl.core.color import Color
+from xitomatl.core.events import Change, ChangeEvent
+from xitomatl.core.pomodoro import Pomodoro
+from xitomatl.core.tasks import Break, Task, read_tasks
+from xitomatl.state import State
+
+__all__ = (
+    "Break",
+    "Change",
+    "ChangeEvent",
+    "Color",
+    "ManualClock",
+    "Pomodoro",
+    "State",
+    "Task",
+    "read_tasks",
+)
@@ -0,0 +1,17 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Clock controlled by the caller for tests, soak tests and replaying traces.
+"""
+
+
+class ManualClock:
+    """Returns time in seconds set by the caller instead of the real time."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Change events emitted by the timer.
+"""
+
+from dataclasses import dataclass
+from enum import Flag, auto
+
+
+class Change(Flag):
+    NONE = 0
+    # Current task index
+    TASK = auto()
+    # Running or stopped
+    STATE = auto()
+    # Displayed remaining minutes
+    MINUTE = auto()
+    # Remaining time reached zero
+    TIMED_OUT = auto()
+    # Task was finished (finish commands were run)
+    FINISHED = auto()
+    # Displayed seconds of the final countdown
+    COUNTDOWN = auto()
+    # Elapsed part of task with progress ring
+    PROGRESS = auto()
+    ALL = TASK | STATE | MINUTE | TIMED_OUT | FINISHED | COUNTDOWN | PROGRESS
+    # Changes to anything shown in the icon
+    ICON = TASK | STATE | MINUTE | TIMED_OUT | COUNTDOWN | PROGRESS
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    changes: Change
+    task_index: int
+    state: int
+    remaining_minutes: int
+    timed_out: bool
+    finished: bool
+    # Displayed countdown seconds or None if the countdown is not shown
+    countdown_seconds: int | None
+
+    def changed(self, changes):
+        """Returns True if any of given changes happened."""
+        return bool(self.changes & changes)
+
+    def diff(self, previous):
+        """Returns Change flags for values different from previous event."""
+        changes = Change.NONE
+        if previous is None:
+            return Change.ALL
+        if self.task_index != previous.task_index:
+            changes |= Change.TASK
+        if self.state != previous.state:
+            changes |= Change.STATE
+        if self.remaining_minutes != previous.remaining_minutes:
+            changes |= Change.MINUTE
+        if self.timed_out != previous.timed_out:
+            changes |= Change.TIMED_OUT
+        if self.finished != previous.finished:
+            changes |= Change.FINISHED
+        if self.countdown_seconds != previous.countdown_seconds:
+            changes |= Change.COUNTDOWN
+        return changes
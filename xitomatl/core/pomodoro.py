@@ -0,0 +1,544 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Pomodoro state machine without Qt dependency.
+
+Time is measured with injectable monotonic and wall clocks. Timers are left to
+subclasses, see xitomatl.pomodoro for the Qt one.
+"""
+
+import os
+import shlex
+import time
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import date
+from subprocess import CalledProcessError, run  # nosec B404
+
+from xitomatl.checkpoint import (
+    CHECKPOINT_FILE_NAME,
+    Checkpoint,
+    load_checkpoint,
+    save_checkpoint,
+)
+from xitomatl.core.color import Color
+from xitomatl.core.events import Change, ChangeEvent
+from xitomatl.core.tasks import (
+    DEFAULT_TASK_CACHE_KEY,
+    Break,
+    Task,
+    read_task,
+    read_tasks,
+    to_bool,
+)
+from xitomatl.history import (
+    END_NEXT,
+    END_RESTART,
+    END_SELECT,
+    END_STOP,
+    Session,
+    SessionHistory,
+)
+from xitomatl.log import APP_ID, log
+from xitomatl.metrics import metrics
+from xitomatl.schedule import Schedule
+from xitomatl.shared_state import SharedState, SharedStateWriter
+from xitomatl.state import State
+
+SHORT_BREAK_COUNT = 3
+DEFAULT_COUNTDOWN_SECONDS = 0
+# Delay after passing a second boundary before updating countdown.
+COUNTDOWN_MARGIN_MS = 20
+# Delay after scheduled start time before starting the task.
+SCHEDULE_MARGIN_MS = 100
+# Update interval for tasks showing progress ring.
+PROGRESS_UPDATE_MS = 5000
+
+
+def split_command(command):
+    """Yields arguments for each non-empty line of a hook command."""
+    for subcommand in command.split("\n"):
+        subcommand = subcommand.strip()
+        if subcommand:
+            log.info("Executing: %s", subcommand)
+            yield shlex.split(subcommand)
+
+
+def record_hook(hook, start, code):
+    metrics.observe(
+        "xitomatl_hook_duration_seconds",
+        time.monotonic() - start,
+        hook=hook,
+    )
+    metrics.inc("xitomatl_hook_exit_codes_total", hook=hook, code=code)
+
+
+def _run(command, hook=""):
+    for args in split_command(command):
+        start = time.monotonic()
+        code = "error"
+        try:
+            run(args, shell=False, check=True)  # nosec B603
+            code = 0
+        except CalledProcessError as e:
+            code = e.returncode
+            raise
+        finally:
+            record_hook(hook, start, code)
+
+
+def default_pomodoro_tasks():
+    focus = Task(minutes=25)
+    short_break = Break(minutes=5)
+    long_break = Break(minutes=30, in_menu=True)
+    return [focus, short_break] * SHORT_BREAK_COUNT + [focus, long_break]
+
+
+def default_stopped_task():
+    return Task(
+        name="stopped",
+        color=Color.parse("#ff0040"),
+        text_color=Color.parse("white"),
+        minutes=0,
+    )
+
+
+def default_checkpoint_path():
+    path = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(path, APP_ID, CHECKPOINT_FILE_NAME)
+
+
+@contextmanager
+def readArray(settings, name):
+    try:
+        settings.beginReadArray(name)
+        yield
+    except Exception:
+        log.exception(
+            "Failed to read [%s] from configuration file %s",
+            name,
+            settings.fileName(),
+        )
+        raise
+    finally:
+        settings.endArray()
+
+
+@contextmanager
+def enterGroup(settings, name):
+    try:
+        settings.beginGroup(name)
+        yield
+    except Exception:
+        log.exception(
+            "Failed to read [%s] from configuration file %s",
+            name,
+            settings.fileName(),
+        )
+        raise
+    finally:
+        settings.endGroup()
+
+
+class Pomodoro:
+    def __init__(self, settings, clock=time.monotonic, wall_clock=time.time):
+        """
+        Creates timer from settings (QSettings or an object with the same
+        interface), clock returning monotonic time in seconds and wall_clock
+        returning seconds since epoch (for schedule, history and checkpoints).
+        """
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.state = State.Stopped
+
+        with readArray(settings, "tasks"):
+            self.tasks = read_tasks(settings) or default_pomodoro_tasks()
+
+        with enterGroup(settings, "stopped"):
+            task_cache = {DEFAULT_TASK_CACHE_KEY: default_stopped_task()}
+            self.stopped_task = read_task(settings, task_cache)
+
+        self.schedule = None
+        schedule_path = settings.value("schedule")
+        if schedule_path:
+            try:
+                self.schedule = Schedule.load(
+                    schedule_path, self.tasks, self.wall_clock()
+                )
+                self.tasks = self.schedule.tasks()
+            except (OSError, ValueError):
+                log.exception("Failed to load schedule %s", schedule_path)
+
+        self.shared_state = None
+        if to_bool(settings.value("shared_state", "false")):
+            try:
+                path = settings.value("shared_state_path")
+                self.shared_state = SharedStateWriter(path)
+            except OSError:
+                log.exception("Failed to create shared state file")
+
+        self.history = SessionHistory()
+        self.current_task_index = self._first_task_index()
+        # Clock time the current task started.
+        self.started = clock()
+        # Time elapsed before the app started if the task was resumed.
+        self.elapsed_offset = 0
+
+        self.finished = True
+        self.last_event = None
+        self._publish_status()
+
+        self.countdown_seconds = int(
+            settings.value("countdown_seconds", DEFAULT_COUNTDOWN_SECONDS)
+        )
+
+        log.info("[%s] Initialized", self)
+
+        self.checkpoint_path = None
+        if to_bool(settings.value("resume", "false")):
+            self.checkpoint_path = (
+                settings.value("checkpoint_path") or self.default_checkpoint_path()
+            )
+
+        if self._restore_checkpoint():
+            return
+
+        autostart = settings.value("autostart", "true")
+        if to_bool(autostart):
+            self.start()
+
+    def __str__(self):
+        state = "⏸︎" if self.state == State.Stopped else "⏵︎"
+        return (
+            f"{self.current_task_index + 1}/{len(self.tasks)}"
+            f" {self.current_task()}"
+            f" {self.elapsed_minutes()}m {state}"
+        )
+
+    def current_task(self):
+        if self.state == State.Running:
+            return self.tasks[self.current_task_index]
+
+        return self.stopped_task
+
+    def start_task(self, index):
+        log.info("[%s] Select start", self)
+        metrics.inc("xitomatl_actions_total", action="start_task")
+        if self.state == State.Running:
+            self._record_session(END_SELECT)
+            self._run_command_stop()
+        self.state = State.Running
+        self.current_task_index = index
+        self.on_changed()
+        self._run_command_start()
+
+    def stop(self):
+        log.info("[%s] Stop", self)
+        metrics.inc("xitomatl_actions_total", action="stop")
+        if self.state == State.Running:
+            self._record_session(END_STOP)
+            self._run_command_stop()
+        self.state = State.Stopped
+        self.current_task_index = -1
+        self.on_changed()
+
+    def default_checkpoint_path(self):
+        return default_checkpoint_path()
+
+    def elapsed_milliseconds(self):
+        return int((self.clock() - self.started) * 1000) + self.elapsed_offset
+
+    def elapsed_minutes(self):
+        return int(self.elapsed_milliseconds() / 60000)
+
+    def remaining_minutes(self):
+        return self.current_task().minutes - self.elapsed_minutes()
+
+    def remaining_milliseconds(self):
+        return self.current_task().minutes * 60000 - self.elapsed_milliseconds()
+
+    def remaining_seconds(self):
+        return -(-self.remaining_milliseconds() // 1000)
+
+    def progress(self):
+        """Returns elapsed part of the current task (0.0..1.0)."""
+        total = self.current_task().minutes * 60000
+        if total <= 0:
+            return 1.0
+        return min(self.elapsed_milliseconds() / total, 1.0)
+
+    def is_countdown(self):
+        """Returns True if the final seconds countdown should be shown."""
+        return self.state == State.Running and self._is_countdown(
+            self.remaining_milliseconds()
+        )
+
+    def _is_countdown(self, remaining):
+        return 0 < remaining <= self.countdown_seconds * 1000
+
+    def start(self):
+        log.info("[%s] Start", self)
+        metrics.inc("xitomatl_actions_total", action="start")
+        if self.state == State.Running:
+            self._record_session(END_RESTART)
+            self._run_command_stop()
+        if self.current_task_index == -1:
+            self.current_task_index = self._first_task_index()
+        self.state = State.Running
+        self.on_changed()
+        self._run_command_start()
+
+    def next(self):
+        log.info("[%s] Next", self)
+        metrics.inc("xitomatl_actions_total", action="next")
+        if self.state == State.Running:
+            self._record_session(END_NEXT)
+            self._run_command_stop()
+        self.current_task_index = (self.current_task_index + 1) % len(self.tasks)
+        self.on_changed()
+        self._run_command_start()
+
+    def finish(self):
+        log.info("[%s] Finished", self)
+        metrics.inc("xitomatl_actions_total", action="finish")
+        self.finished = True
+        self._publish_status()
+        self._save_checkpoint()
+        self._run_command_finish()
+
+    def on_changed(self):
+        self.started = self.clock()
+        self.elapsed_offset = 0
+        self.finished = False
+        self._publish_status()
+        self._save_checkpoint()
+        self._update_schedule()
+        log.info("[%s]", self)
+        self._notify()
+
+    def update(self):
+        """
+        Finishes the task if its time is up and emits change event.
+
+        Returns (interval, countdown) where interval is the time in
+        milliseconds until the next update is needed (None if stopped) and
+        countdown is True if the interval should be kept precisely.
+        """
+        if self.state == State.Stopped:
+            self._check_changes()
+            return None, False
+
+        remaining = self.remaining_milliseconds()
+
+        if not self.finished and remaining <= 0:
+            self.finish()
+        self._check_changes()
+
+        if self._is_countdown(remaining):
+            return remaining % 1000 + COUNTDOWN_MARGIN_MS, True
+
+        interval = remaining % 60000
+        if interval == 0:
+            interval += 60000
+        interval += 1000
+        countdown = remaining - self.countdown_seconds * 1000
+        if self.countdown_seconds > 0 and countdown > 0:
+            interval = min(interval, countdown + COUNTDOWN_MARGIN_MS)
+        if self.current_task().progress_ring and remaining > 0:
+            interval = min(interval, PROGRESS_UPDATE_MS)
+        return interval, False
+
+    def change_event(self, changes=Change.ALL):
+        """Returns ChangeEvent with current values."""
+        running = self.state == State.Running
+        return ChangeEvent(
+            changes=changes,
+            task_index=self.current_task_index,
+            state=self.state,
+            remaining_minutes=self.remaining_minutes(),
+            timed_out=running and self.remaining_milliseconds() <= 0,
+            finished=self.finished,
+            countdown_seconds=self.remaining_seconds() if self.is_countdown() else None,
+        )
+
+    def _check_changes(self):
+        event = self.change_event()
+        changes = event.diff(self.last_event)
+        if self.state == State.Running and self.current_task().progress_ring:
+            changes |= Change.PROGRESS
+        self.last_event = event
+        if changes:
+            self._emit_change(replace(event, changes=changes))
+
+    def started_time(self):
+        """Returns wall-clock time the current task started."""
+        return self.wall_clock() - self.elapsed_milliseconds() / 1000
+
+    def summary(self):
+        return self.history.summary_text(date.fromtimestamp(self.wall_clock()))
+
+    def _record_session(self, reason):
+        task = self.current_task()
+        self.history.record(
+            Session(
+                started=self.started_time(),
+                duration=self.elapsed_milliseconds() / 1000,
+                task_index=self.current_task_index,
+                name=task.name,
+                minutes=task.minutes,
+                reason=reason,
+            )
+        )
+
+    def _publish_status(self):
+        task = self.current_task()
+        metrics.set_status(
+            self.current_task_index,
+            task.name,
+            self.state,
+            task.minutes,
+            self.elapsed_milliseconds() / 1000,
+        )
+        if self.shared_state:
+            self.shared_state.write(
+                SharedState(
+                    self.current_task_index,
+                    task.name,
+                    self.state,
+                    self.started_time(),
+                    task.minutes,
+                    self.finished,
+                )
+            )
+
+    def close_shared_state(self):
+        """Publishes stopped state so readers do not see the app running."""
+        if not self.shared_state:
+            return
+
+        self.shared_state.write(
+            SharedState(
+                -1,
+                self.stopped_task.name,
+                State.Stopped,
+                self.wall_clock(),
+                self.stopped_task.minutes,
+                False,
+            )
+        )
+        self.shared_state.close()
+        self.shared_state = None
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+
+        checkpoint = Checkpoint(
+            task_index=self.current_task_index,
+            task_name=self.current_task().name,
+            state=self.state,
+            started=self.started_time(),
+            finished=self.finished,
+        )
+        try:
+            save_checkpoint(self.checkpoint_path, checkpoint)
+        except OSError:
+            log.exception("Failed to save checkpoint %s", self.checkpoint_path)
+
+    def _restore_checkpoint(self):
+        """
+        Restores task from checkpoint without running any commands.
+
+        Returns True if restored.
+        """
+        if not self.checkpoint_path:
+            return False
+
+        checkpoint = load_checkpoint(self.checkpoint_path)
+        if checkpoint is None:
+            return False
+
+        if checkpoint.state == State.Stopped:
+            self.state = State.Stopped
+            self.current_task_index = -1
+        elif (
+            checkpoint.state == State.Running
+            and 0 <= checkpoint.task_index < len(self.tasks)
+            and self.tasks[checkpoint.task_index].name == checkpoint.task_name
+        ):
+            self.state = State.Running
+            self.current_task_index = checkpoint.task_index
+            self.finished = checkpoint.finished
+            self.started = self.clock()
+            elapsed = self.wall_clock() - checkpoint.started
+            self.elapsed_offset = max(0, int(elapsed * 1000))
+        else:
+            log.warning("Ignoring checkpoint not matching configured tasks")
+            return False
+
+        log.info("[%s] Restored", self)
+        self._publish_status()
+        self._update_schedule()
+        self._notify()
+        return True
+
+    def on_schedule_timeout(self):
+        now = self.wall_clock()
+        self.schedule.roll_over(now)
+        index = self.schedule.index_at(now)
+        if self.state == State.Running and index != self.current_task_index:
+            log.info("[%s] Scheduled start", self)
+            self.start_task(index)
+        else:
+            self._update_schedule()
+
+    def _first_task_index(self):
+        if self.schedule:
+            now = self.wall_clock()
+            self.schedule.roll_over(now)
+            return self.schedule.index_at(now)
+        return 0
+
+    def _update_schedule(self):
+        """Regenerate schedule from the current task and wait for next one."""
+        if not self.schedule:
+            return
+
+        self._stop_schedule_timer()
+        if self.state != State.Running:
+            return
+
+        now = self.wall_clock()
+        self.schedule.roll_over(now)
+        # Task started before midnight starts the new day.
+        started = max(self.started_time(), self.schedule.day_start)
+        self.schedule.reschedule(self.current_task_index, started)
+        next_start = self.schedule.next_transition(now)
+        if next_start is not None:
+            interval = int((next_start - now) * 1000) + SCHEDULE_MARGIN_MS
+            log.debug("Scheduling next task in %s ms", interval)
+            self._start_schedule_timer(interval)
+
+    def _notify(self):
+        """Called after the state changed, the timer should be restarted."""
+        self.update()
+
+    def _emit_change(self, event):
+        """Called with ChangeEvent if anything changed."""
+
+    def _start_schedule_timer(self, interval):
+        """Called to run on_schedule_timeout() after interval milliseconds."""
+
+    def _stop_schedule_timer(self):
+        """Called to cancel pending on_schedule_timeout()."""
+
+    def _run_command_start(self):
+        task = self.current_task()
+        _run(task.command_start, "start")
+
+    def _run_command_stop(self):
+        task = self.current_task()
+        _run(task.command_stop, "stop")
+
+    def _run_command_finish(self):
+        task = self.current_task()
+        _run(task.command_finish, "finish")
@@ -1,8 +1,8 @@
 # SPDX-License-Identifier: LGPL-2.0-or-later
 from copy import copy
-from dataclasses import dataclass, field, fields
+from dataclasses import dataclass, fields
 
-from PySide6.QtGui import QColor
+from xitomatl.core.color import Color
 
 DEFAULT_FONT = "Noto Sans Mono; SemiBold"
 DEFAULT_TIMEOUT_FONT = "Noto Sans Mono; Bold"
@@ -27,11 +27,6 @@ class TimedOutTask:
         return getattr(self.task, attr)
 
 
-def color_field(color_name):
-    # pylint: disable=invalid-field-call
-    return field(default_factory=lambda: QColor(color_name))
-
-
 @dataclass
 class Task:
     name: str = "focus"
@@ -44,33 +39,46 @@ class Task:
 
     # Normal appearance options
     font: str = DEFAULT_FONT
-    color: QColor = color_field("#007ba7")
-    line_color: QColor = color_field("transparent")
+    color: Color = Color.parse("#007ba7")
+    line_color: Color = Color.parse("transparent")
     line_width: int = 0
-    text_color: QColor = color_field("white")
+    text_color: Color = Color.parse("white")
     text_stroke_width: int = 0
-    text_stroke_color: QColor = color_field("transparent")
+    text_stroke_color: Color = Color.parse("transparent")
     text_size: int = 65
     text_x: int = 0
     text_y: int = 0
     icon_radius: int = 30
     icon_padding: int = 10
+    progress_color: Color = Color.parse("white")
+    progress_width: int = 8
 
     # Timed out appearance options
     timeout_font = DEFAULT_TIMEOUT_FONT
-    timeout_color: QColor = color_field("#ff0040")
-    timeout_line_color: QColor = color_field("transparent")
+    timeout_color: Color = Color.parse("#ff0040")
+    timeout_line_color: Color = Color.parse("transparent")
     timeout_line_width: int = 0
-    timeout_text_color: QColor = color_field("white")
+    timeout_text_color: Color = Color.parse("white")
     timeout_text_stroke_width: int = 0
-    timeout_text_stroke_color: QColor = color_field("transparent")
+    timeout_text_stroke_color: Color = Color.parse("transparent")
     timeout_text_size: int = 65
     timeout_text_x: int = 0
     timeout_text_y: int = 0
     timeout_icon_radius: int = 30
     timeout_icon_padding: int = 10
+    timeout_progress_color: Color = Color.parse("#ff0040")
 
     animated: bool = True
+    # Overtime animation repeats after interval (seconds) which grows by
+    # backoff factor up to max_interval
+    animation_interval: int = 20
+    animation_backoff: float = 1.5
+    animation_max_interval: int = 600
+    animation_frames_per_hour: int = 1500
+    # Seconds to pause animation after clicking the icon
+    animation_click_pause: int = 60
+    animation_idle_pause: bool = True
+    progress_ring: bool = False
 
     def __str__(self):
         return f"{self.name}/{self.minutes}"
@@ -84,10 +92,10 @@ class Break(Task):
         super().__init__(
             name="break",
             minutes=minutes,
-            color=QColor("#de3163"),
-            text_color=QColor("white"),
-            timeout_color=QColor("#ffbf00"),
-            timeout_text_color=QColor("black"),
+            color=Color.parse("#de3163"),
+            text_color=Color.parse("white"),
+            timeout_color=Color.parse("#ffbf00"),
+            timeout_text_color=Color.parse("black"),
             in_menu=in_menu,
             icon_radius=100,
             text_y=0,
@@ -107,6 +115,8 @@ def read_task(settings, task_cache):
             convert = field_.type
             if convert is bool:
                 convert = to_bool
+            elif convert is Color:
+                convert = Color.parse
             setattr(task, field_.name, convert(value))
 
     task_cache[DEFAULT_TASK_CACHE_KEY] = copy(task)
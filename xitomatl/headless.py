@@ -0,0 +1,171 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Timer without tray icon, for example, to run as a systemd user service.
+
+Uses only QtCore (no QtGui or QtWidgets) and renders no icons.
+
+Controlled with Unix signals:
+
+    SIGUSR1          start the task or start the next one if running
+    SIGUSR2          stop
+    SIGINT, SIGTERM  quit
+
+or with commands on standard input, one per line:
+
+    start, next, stop, toggle, task N (1-based index), status, quit
+"""
+
+import json
+import os
+import signal
+import socket
+import sys
+from functools import partial
+
+from PySide6.QtCore import QCoreApplication, QSocketNotifier
+
+from xitomatl.core.events import Change
+from xitomatl.log import log
+from xitomatl.metrics_server import serve_metrics_from_settings
+from xitomatl.pomodoro import Pomodoro
+from xitomatl.state import State
+from xitomatl.status import status
+
+READ_SIZE = 4096
+COMMAND_QUIT = "quit"
+STATUS_CHANGES = Change.TASK | Change.STATE | Change.MINUTE | Change.TIMED_OUT
+
+
+def toggle(pomodoro):
+    if pomodoro.state == State.Running:
+        pomodoro.next()
+    else:
+        pomodoro.start()
+
+
+def run_command(pomodoro, line):
+    """
+    Runs command from a line of text.
+
+    Returns text to print or None. Raises ValueError for invalid command.
+    """
+    name, *args = line.split() or [""]
+    if args and name != "task":
+        raise ValueError(f"Unexpected arguments: {line}")
+
+    if name == "start":
+        pomodoro.start()
+    elif name == "next":
+        pomodoro.next()
+    elif name == "stop":
+        pomodoro.stop()
+    elif name == "toggle":
+        toggle(pomodoro)
+    elif name == "task":
+        if len(args) != 1 or not args[0].isdigit():
+            raise ValueError(f"Expected task number: {line}")
+        number = int(args[0])
+        if not 1 <= number <= len(pomodoro.tasks):
+            raise ValueError(f"Task number out of range: {line}")
+        pomodoro.start_task(number - 1)
+    elif name == "status":
+        return json.dumps(status(pomodoro), ensure_ascii=False)
+    else:
+        raise ValueError(f"Unknown command: {line}")
+
+    return None
+
+
+class Headless:
+    def __init__(self, argv, settings, status_stream=None):
+        self.app = QCoreApplication(argv)
+
+        self.status_stream = status_stream
+        self.pomodoro = Pomodoro(settings)
+        self.metrics_server = serve_metrics_from_settings(settings)
+        self.pomodoro.changed.connect(self.on_changed)
+
+        self.signal_actions = {
+            signal.SIGUSR1: partial(toggle, self.pomodoro),
+            signal.SIGUSR2: self.pomodoro.stop,
+            signal.SIGINT: self.app.quit,
+            signal.SIGTERM: self.app.quit,
+        }
+        self._init_signals()
+
+        self.input = b""
+        self.input_notifier = None
+        if sys.stdin is not None:
+            self.input_notifier = QSocketNotifier(
+                sys.stdin.fileno(), QSocketNotifier.Type.Read
+            )
+            self.input_notifier.activated.connect(self.on_input)
+
+        self.on_changed(self.pomodoro.change_event())
+
+    def _init_signals(self):
+        # Python signal handlers run only when the interpreter gets control,
+        # so the signal numbers are written to a socket that wakes the event
+        # loop and the actions run from the notifier.
+        self.signal_reader, self.signal_writer = socket.socketpair()
+        self.signal_reader.setblocking(False)
+        self.signal_writer.setblocking(False)
+        signal.set_wakeup_fd(self.signal_writer.fileno())
+        for signum in self.signal_actions:
+            signal.signal(signum, lambda *_: None)
+
+        self.signal_notifier = QSocketNotifier(
+            self.signal_reader.fileno(), QSocketNotifier.Type.Read
+        )
+        self.signal_notifier.activated.connect(self.on_signal)
+
+    def on_signal(self):
+        try:
+            data = self.signal_reader.recv(READ_SIZE)
+        except BlockingIOError:
+            return
+
+        for signum in data:
+            action = self.signal_actions.get(signum)
+            if action:
+                log.debug("Received signal %s", signal.Signals(signum).name)
+                action()
+
+    def on_input(self):
+        data = os.read(self.input_notifier.socket(), READ_SIZE)
+        if not data:
+            log.debug("Standard input closed")
+            self.input_notifier.setEnabled(False)
+            data = b"\n"
+
+        self.input += data
+        *lines, self.input = self.input.split(b"\n")
+        for line in lines:
+            line = line.decode("utf-8", errors="replace").strip()
+            if line:
+                self.on_command(line)
+
+    def on_command(self, line):
+        if line == COMMAND_QUIT:
+            self.app.quit()
+            return
+
+        try:
+            output = run_command(self.pomodoro, line)
+        except ValueError as e:
+            log.warning("%s", e)
+            return
+
+        if output is not None:
+            print(output, flush=True)
+
+    def on_changed(self, event):
+        if self.status_stream and event.changed(STATUS_CHANGES):
+            self.status_stream.update(self.pomodoro)
+
+    def exec(self):
+        try:
+            return self.app.exec()
+        finally:
+            self.pomodoro.close_shared_state()
+            signal.set_wakeup_fd(-1)
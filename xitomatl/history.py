@@ -0,0 +1,181 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+In-memory history of completed tasks.
+
+Sessions are stored in a fixed-size ring buffer with one typed array per
+column so that summaries over any time window are computed by scanning the
+columns. Totals per day and task name are also kept up to date on each
+record (and eviction) so that the summary for today is available without
+any scan.
+"""
+
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import compress
+
+DEFAULT_CAPACITY = 4096
+
+END_NEXT = 0
+END_STOP = 1
+END_SELECT = 2
+END_RESTART = 3
+END_REASONS = ("next", "stop", "select", "restart")
+
+
+def day_of(timestamp):
+    return datetime.fromtimestamp(timestamp).toordinal()
+
+
+def format_duration(seconds):
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h{minutes % 60:02d}m"
+
+
+@dataclass(frozen=True)
+class Session:
+    # Wall-clock time the task started
+    started: float
+    # Seconds the task ran
+    duration: float
+    task_index: int
+    name: str
+    minutes: int
+    # One of END_* values
+    reason: int
+
+
+class Totals:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.overtime = 0.0
+
+    def add(self, duration, overtime, sign=1):
+        self.count += sign
+        self.duration += sign * duration
+        self.overtime += sign * overtime
+
+    def __str__(self):
+        text = f"{self.count}× {format_duration(self.duration)}"
+        if self.overtime >= 60:
+            text += f" +{format_duration(self.overtime)}"
+        return text
+
+
+class SessionHistory:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.size = 0
+        # Index of the next slot to write.
+        self.head = 0
+
+        self.started = array("d", [0.0]) * capacity
+        self.duration = array("d", [0.0]) * capacity
+        self.overtime = array("d", [0.0]) * capacity
+        self.task_index = array("i", [0]) * capacity
+        self.reason = array("B", [0]) * capacity
+        self.day = array("l", [0]) * capacity
+        self.name_id = array("H", [0]) * capacity
+
+        self.names = []
+        self.name_ids = {}
+
+        # Totals per day and name_id, updated on record and eviction.
+        self.totals = {}
+        self.text_day = None
+        self.text = ""
+
+    def __len__(self):
+        return self.size
+
+    def _intern(self, name):
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self.name_ids[name] = name_id
+        return name_id
+
+    def _add_totals(self, slot, sign):
+        day = self.day[slot]
+        name_id = self.name_id[slot]
+        day_totals = self.totals.setdefault(day, {})
+        totals = day_totals.get(name_id)
+        if totals is None:
+            totals = Totals()
+            day_totals[name_id] = totals
+        totals.add(self.duration[slot], self.overtime[slot], sign)
+        if totals.count == 0:
+            del day_totals[name_id]
+            if not day_totals:
+                del self.totals[day]
+        return day
+
+    def record(self, session):
+        slot = self.head
+        changed_days = set()
+        if self.size == self.capacity:
+            changed_days.add(self._add_totals(slot, -1))
+        else:
+            self.size += 1
+
+        self.started[slot] = session.started
+        self.duration[slot] = session.duration
+        self.overtime[slot] = max(0.0, session.duration - session.minutes * 60)
+        self.task_index[slot] = session.task_index
+        self.reason[slot] = session.reason
+        self.day[slot] = day_of(session.started)
+        self.name_id[slot] = self._intern(session.name)
+        changed_days.add(self._add_totals(slot, 1))
+
+        self.head = (slot + 1) % self.capacity
+
+        if self.text_day in changed_days:
+            self.text_day = None
+
+    def day_totals(self, day):
+        """Returns {name: Totals} for given day (date ordinal)."""
+        return {
+            self.names[name_id]: totals
+            for name_id, totals in self.totals.get(day, {}).items()
+        }
+
+    def summary_text(self, today=None):
+        """Returns summary for today, cached until the next change."""
+        day = (today or date.today()).toordinal()
+        if self.text_day != day:
+            totals = self.day_totals(day)
+            parts = ", ".join(f"{name} {totals[name]}" for name in sorted(totals))
+            self.text = f"Today: {parts}" if parts else ""
+            self.text_day = day
+        return self.text
+
+    def summarize(self, since=0.0, until=None):
+        """
+        Returns {name: Totals} for sessions started in given time window.
+
+        Scans the columns so any window (for example, the last week) can be
+        summarized.
+        """
+        size = self.size
+        if until is None:
+            until = math.inf
+        mask = [since <= t < until for t in self.started[:size]]
+        rows = compress(
+            zip(self.name_id[:size], self.duration[:size], self.overtime[:size]),
+            mask,
+        )
+
+        totals_by_id = {}
+        for name_id, duration, overtime in rows:
+            totals = totals_by_id.get(name_id)
+            if totals is None:
+                totals = Totals()
+                totals_by_id[name_id] = totals
+            totals.add(duration, overtime)
+
+        return {self.names[name_id]: t for name_id, t in totals_by_id.items()}
@@ -1,22 +1,63 @@
 # SPDX-License-Identifier: LGPL-2.0-or-later
-from PySide6.QtCore import QPoint, Qt
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from functools import cache
+from threading import Lock
+
+from PySide6.QtCore import QPoint, QPointF, QRect, QRectF, Qt
 from PySide6.QtGui import (
+    QColor,
     QColorConstants,
     QFont,
     QFontMetrics,
+    QImage,
+    QImageReader,
     QPainter,
     QPainterPath,
     QPen,
-    QPixmap,
 )
 
 from xitomatl.log import log
 from xitomatl.state import State
 
+DIGITS = "0123456789"
+
 unavailable_fonts = set()
 
 
-def render_text(painter, task, size, icon_text):
+@dataclass(frozen=True)
+class IconRequest:
+    task: object
+    state: int
+    remaining_minutes: int
+    icon_size: int
+    countdown_seconds: int | None = None
+    progress: float | None = None
+    frame: int = 0
+
+    def key(self):
+        # Progress is compared in degrees so prefetched ring icons can match.
+        progress = None if self.progress is None else round(self.progress * 360)
+        # Tasks are compared by value so edited or re-read tasks do not hit
+        # icons cached for a different appearance.
+        task = tuple(getattr(self.task, f.name) for f in fields(self.task))
+        return (
+            task,
+            self.state,
+            self.remaining_minutes,
+            self.icon_size,
+            self.countdown_seconds,
+            progress,
+            self.frame,
+        )
+
+
+@cache
+def qcolor(color):
+    return QColor(*color)
+
+
+def task_font(task, icon_width):
     family, *style = task.font.split(";", maxsplit=1)
     family = family.strip()
     font = QFont(family)
@@ -27,7 +68,12 @@ def render_text(painter, task, size, icon_text):
     if style:
         font.setStyleName(style[0].strip())
 
-    font.setPixelSize(task.text_size * size.width() // 100)
+    font.setPixelSize(task.text_size * icon_width // 100)
+    return font
+
+
+def render_text(painter, task, size, icon_text):
+    font = task_font(task, size.width())
 
     metrics = QFontMetrics(font)
     rect = metrics.tightBoundingRect(icon_text)
@@ -48,55 +94,427 @@ def render_text(painter, task, size, icon_text):
         path = QPainterPath()
         path.addText(pos, font, icon_text)
         stroke = QPen(
-            task.text_stroke_color,
+            qcolor(task.text_stroke_color),
             task.text_stroke_width * size.width() // 100,
         )
         painter.strokePath(path, stroke)
 
     painter.setFont(font)
-    painter.setPen(task.text_color)
+    painter.setPen(qcolor(task.text_color))
     painter.drawText(pos, icon_text)
 
 
+def _new_image(width, height):
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(QColorConstants.Transparent)
+    return image
+
+
+def _new_painter(image):
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    return painter
+
+
+def image_rect(task, icon_size):
+    pad = task.icon_padding * icon_size // 100
+    return QRect(0, 0, icon_size, icon_size).adjusted(pad, pad, -pad, -pad)
+
+
+def render_background(painter, task, state, icon_size, image=None):
+    """
+    Draw icon background.
+
+    The image (for example, a decoded frame) is used instead of loading
+    task.image if set.
+    """
+    pen = QPen(qcolor(task.line_color), task.line_width * icon_size // 100)
+    painter.setPen(pen)
+
+    pad = task.icon_padding * icon_size // 100
+    painter.setBrush(qcolor(task.color))
+    rect = painter.device().rect().adjusted(pad, pad, -pad, -pad)
+    if task.image:
+        if image is None:
+            image = QImage(task.image)
+        if image.isNull():
+            log.warning("Failed to load image: %s", task.image)
+        else:
+            painter.drawImage(rect, image)
+    else:
+        painter.drawRoundedRect(
+            rect, task.icon_radius, task.icon_radius, Qt.SizeMode.RelativeSize
+        )
+
+    if state == State.Stopped:
+        painter.setBrush(qcolor(task.text_color))
+        pad *= 3
+        rect = painter.device().rect().adjusted(pad, pad, -pad, -pad)
+        painter.drawRect(rect)
+
+
 def task_icon(task, state, remaining_minutes, icon_size):
-    """Create icon for given task and state."""
-    pix = QPixmap(icon_size, icon_size)
-    pix.fill(QColorConstants.Transparent)
-    painter = QPainter(pix)
-    try:
-        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    """
+    Create icon image for given task and state.
 
+    This is safe to call from non-GUI threads.
+    """
+    image = _new_image(icon_size, icon_size)
+    painter = _new_painter(image)
+    try:
         remaining = remaining_minutes
         if state == State.Running:
             if remaining <= 0:
                 remaining = -remaining
                 task = task.as_timed_out()
 
-        painter.setPen(QPen(task.line_color, task.line_width * icon_size // 100))
-
-        pad = task.icon_padding * icon_size // 100
-        painter.setBrush(task.color)
-        rect = pix.rect().adjusted(pad, pad, -pad, -pad)
-        if task.image:
-            image = QPixmap(task.image)
-            if image.isNull():
-                log.warning("Failed to load image: %s", task.image)
-            else:
-                painter.drawPixmap(rect, image)
-        else:
-            painter.drawRoundedRect(
-                rect, task.icon_radius, task.icon_radius, Qt.SizeMode.RelativeSize
-            )
+        render_background(painter, task, state, icon_size)
 
-        if state == State.Stopped:
-            painter.setBrush(task.text_color)
-            pad *= 3
-            rect = pix.rect().adjusted(pad, pad, -pad, -pad)
-            painter.drawRect(rect)
-        elif state == State.Running:
-            render_text(painter, task, pix.size(), str(remaining))
+        if state == State.Running:
+            render_text(painter, task, image.size(), str(remaining))
     finally:
         painter.end()
 
-    return pix
+    return image
+
+
+BACKGROUND_FIELDS = (
+    "image",
+    "color",
+    "line_color",
+    "line_width",
+    "text_color",
+    "icon_radius",
+    "icon_padding",
+)
+TEXT_FIELDS = (
+    "font",
+    "text_size",
+    "text_color",
+    "text_stroke_width",
+    "text_stroke_color",
+    "text_x",
+    "text_y",
+)
+MAX_TEXT_LAYERS = 64
+# Frames shown for shorter time are merged with the following ones.
+MAX_IMAGE_FPS = 10
+# Delay for frames without any (as in web browsers).
+DEFAULT_FRAME_DELAY_MS = 100
+# Memory limit for frames of a single animated image and for all of them.
+MAX_IMAGE_FRAMES_BYTES = 4 * 1024 * 1024
+MAX_IMAGE_CACHE_BYTES = 16 * 1024 * 1024
+
+
+def _appearance_key(task, names):
+    return tuple(getattr(task, name) for name in names)
+
+
+def render_progress(painter, task, progress, icon_size):
+    """Draw arc around the icon for elapsed part of the task."""
+    width = task.progress_width * icon_size // 100
+    if width <= 0 or progress <= 0:
+        return
+
+    pad = width / 2
+    rect = QRectF(0, 0, icon_size, icon_size).adjusted(pad, pad, -pad, -pad)
+    pen = QPen(qcolor(task.progress_color), width)
+    pen.setCapStyle(Qt.PenCapStyle.FlatCap)
+    painter.setPen(pen)
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    # Angles are in 1/16th of a degree, starting at 12 o'clock clockwise.
+    painter.drawArc(rect, 90 * 16, -round(min(progress, 1.0) * 360 * 16))
+
+
+class ImageFrames:
+    """Decoded frames of an image pre-scaled for the icon."""
+
+    def __init__(self, frames, delays):
+        self.frames = frames
+        # Milliseconds each frame is shown
+        self.delays = delays
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def nbytes(self):
+        return sum(frame.sizeInBytes() for frame in self.frames)
+
+    def frame(self, index):
+        return self.frames[index % len(self.frames)]
+
+
+def collect_frames(frames, max_frames, min_delay=1000 // MAX_IMAGE_FPS):
+    """
+    Returns frames and their delays from iterable of (frame, delay).
+
+    Frames shown shorter than min_delay are merged with the following ones.
+    If there are more than max_frames, every other frame is dropped (until
+    the end) and its delay added to the previous frame.
+    """
+    kept = []
+    delays = []
+    step = 1
+    for index, (frame, delay) in enumerate(frames):
+        if kept and (index % step != 0 or delays[-1] < min_delay):
+            delays[-1] += delay
+            continue
+
+        kept.append(frame)
+        delays.append(delay)
+        if len(kept) > max_frames:
+            kept = kept[::2]
+            delays = [sum(delays[i : i + 2]) for i in range(0, len(delays), 2)]
+            step *= 2
+
+    return kept, delays
+
+
+def _read_frames(reader, size):
+    while True:
+        image = reader.read()
+        if image.isNull():
+            return
+        delay = reader.nextImageDelay() or DEFAULT_FRAME_DELAY_MS
+        image = image.scaled(
+            size,
+            Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        ).convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        yield image, delay
+
+
+def decode_image(path, size):
+    """Returns ImageFrames for image scaled to given size (QSize)."""
+    reader = QImageReader(path)
+    frame_bytes = max(1, size.width() * size.height() * 4)
+    max_frames = max(1, MAX_IMAGE_FRAMES_BYTES // frame_bytes)
+    frames, delays = collect_frames(_read_frames(reader, size), max_frames)
+    if not frames:
+        return ImageFrames([QImage()], [0])
+    return ImageFrames(frames, delays)
+
+
+class Glyph:
+    def __init__(self, image, advance, origin):
+        self.image = image
+        self.advance = advance
+        # Position of the glyph baseline origin in the image.
+        self.origin = origin
+
+
+class GlyphAtlas:
+    """
+    Cache of pre-rendered digits.
+
+    Numbers are drawn by blitting the cached digit images so that frequent
+    updates (for example, a seconds countdown) avoid font lookup and path
+    stroking.
+    """
+
+    def __init__(self):
+        self.glyphs = {}
+        self.digit_rects = {}
+
+    def _font_key(self, task, icon_size):
+        return (
+            task.font,
+            task.text_size * icon_size // 100,
+            task.text_stroke_width * icon_size // 100,
+            task.text_stroke_color,
+            task.text_color,
+        )
+
+    def _render_glyph(self, task, char, icon_size):
+        font = task_font(task, icon_size)
+        metrics = QFontMetrics(font)
+        stroke_width = task.text_stroke_width * icon_size // 100
+        pad = stroke_width + 1
+        advance = metrics.horizontalAdvance(char)
+        image = _new_image(advance + 2 * pad, metrics.height() + 2 * pad)
+        origin = QPointF(pad, pad + metrics.ascent())
+        painter = _new_painter(image)
+        try:
+            if stroke_width > 0:
+                path = QPainterPath()
+                path.addText(origin, font, char)
+                pen = QPen(qcolor(task.text_stroke_color), stroke_width)
+                painter.strokePath(path, pen)
+            painter.setFont(font)
+            painter.setPen(qcolor(task.text_color))
+            painter.drawText(origin, char)
+        finally:
+            painter.end()
+        return Glyph(image, advance, origin)
+
+    def glyph(self, task, char, icon_size):
+        key = (*self._font_key(task, icon_size), char)
+        glyph = self.glyphs.get(key)
+        if glyph is None:
+            glyph = self._render_glyph(task, char, icon_size)
+            self.glyphs[key] = glyph
+        return glyph
+
+    def _digit_rect(self, task, icon_size):
+        key = self._font_key(task, icon_size)
+        rect = self.digit_rects.get(key)
+        if rect is None:
+            font = task_font(task, icon_size)
+            rect = QFontMetrics(font).tightBoundingRect(DIGITS)
+            self.digit_rects[key] = rect
+        return rect
+
+    def draw_number(self, painter, task, number, icon_size):
+        glyphs = [self.glyph(task, char, icon_size) for char in str(number)]
+        rect = self._digit_rect(task, icon_size)
+        width = sum(glyph.advance for glyph in glyphs)
+        x = (icon_size - width) / 2 + task.text_x * icon_size / 100
+        baseline = (
+            (icon_size + rect.height()) / 2
+            - task.text_y * icon_size / 100
+            - rect.bottom()
+        )
+        for glyph in glyphs:
+            painter.drawImage(
+                QPointF(x - glyph.origin.x(), baseline - glyph.origin.y()),
+                glyph.image,
+            )
+            x += glyph.advance
+
+    def clear(self):
+        self.glyphs.clear()
+        self.digit_rects.clear()
+
+
+class IconLayers:
+    """
+    Renders task icons by compositing cached layers.
+
+    The background is cached per task appearance and state, the text per
+    displayed number (only recently used ones are kept) and only the dynamic
+    overlay, like the progress ring, is painted for each new icon.
+
+    Icons are rendered into QImage so this can be used from worker threads.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.atlas = GlyphAtlas()
+        self.backgrounds = {}
+        self.text_layers = OrderedDict()
+        self.images = OrderedDict()
+        self.images_bytes = 0
+
+    def image_frames(self, task, icon_size):
+        """Returns decoded ImageFrames of task.image, cached."""
+        size = image_rect(task, icon_size).size()
+        key = (task.image, size.width(), size.height())
+        frames = self.images.get(key)
+        if frames is not None:
+            self.images.move_to_end(key)
+            return frames
+
+        frames = decode_image(task.image, size)
+        self.images[key] = frames
+        self.images_bytes += frames.nbytes
+        while self.images_bytes > MAX_IMAGE_CACHE_BYTES and len(self.images) > 1:
+            _, evicted = self.images.popitem(last=False)
+            self.images_bytes -= evicted.nbytes
+        return frames
+
+    def frame_delays(self, task, icon_size):
+        """Returns delays of animated task image frames, empty if static."""
+        if not task.image:
+            return []
+
+        with self.lock:
+            frames = self.image_frames(task, icon_size)
+            return frames.delays if len(frames) > 1 else []
+
+    def background(self, task, state, icon_size, frame=0):
+        frames = self.image_frames(task, icon_size) if task.image else None
+        animated = frames is not None and len(frames) > 1
+        key = (state, icon_size, *_appearance_key(task, BACKGROUND_FIELDS))
+        image = None if animated else self.backgrounds.get(key)
+        if image is None:
+            image = _new_image(icon_size, icon_size)
+            painter = _new_painter(image)
+            try:
+                render_background(
+                    painter,
+                    task,
+                    state,
+                    icon_size,
+                    None if frames is None else frames.frame(frame),
+                )
+            finally:
+                painter.end()
+            if not animated:
+                self.backgrounds[key] = image
+        return image
+
+    def text_layer(self, task, text, icon_size):
+        key = (text, icon_size, *_appearance_key(task, TEXT_FIELDS))
+        image = self.text_layers.get(key)
+        if image is None:
+            image = _new_image(icon_size, icon_size)
+            painter = _new_painter(image)
+            try:
+                render_text(painter, task, image.size(), text)
+            finally:
+                painter.end()
+            self.text_layers[key] = image
+            if len(self.text_layers) > MAX_TEXT_LAYERS:
+                self.text_layers.popitem(last=False)
+        else:
+            self.text_layers.move_to_end(key)
+        return image
+
+    def icon(self, request):
+        """
+        Create icon for given IconRequest.
+
+        If countdown_seconds is set, it is shown instead of remaining minutes.
+        If progress (0.0..1.0) is set, elapsed time is shown as a ring.
+        The frame is the frame index for animated task image.
+        """
+        task = request.task
+        state = request.state
+        icon_size = request.icon_size
+        remaining = request.remaining_minutes
+        if state == State.Running:
+            if remaining <= 0:
+                remaining = -remaining
+                task = task.as_timed_out()
+
+        with self.lock:
+            image = self.background(task, state, icon_size, request.frame).copy()
+            if state != State.Running:
+                return image
+
+            painter = _new_painter(image)
+            try:
+                if request.progress is not None:
+                    render_progress(painter, task, request.progress, icon_size)
+
+                if request.countdown_seconds is not None:
+                    self.atlas.draw_number(
+                        painter, task, request.countdown_seconds, icon_size
+                    )
+                else:
+                    text = self.text_layer(task, str(remaining), icon_size)
+                    painter.drawImage(0, 0, text)
+            finally:
+                painter.end()
+
+        return image
+
+    def clear(self):
+        with self.lock:
+            self.atlas.clear()
+            self.backgrounds.clear()
+            self.text_layers.clear()
+            self.images.clear()
+            self.images_bytes = 0
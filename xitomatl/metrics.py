@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Metrics in Prometheus text format.
+
+This module holds only the thread-safe store so the timer core can import it
+cheaply. The HTTP server is in xitomatl.metrics_server.
+
+Metrics are kept per process. If a process runs multiple timers (see
+xitomatl.aio), counters add up all of them and the status gauges show the
+timer which changed last.
+"""
+
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+
+from xitomatl.state import State
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTERS = {
+    "xitomatl_actions_total": "Number of timer actions by type.",
+    "xitomatl_hook_exit_codes_total": "Number of executed hook commands by exit code.",
+    "xitomatl_icon_renders_total": "Number of rendered tray icons.",
+    "xitomatl_animation_frames_total": "Number of emitted animation frames.",
+    "xitomatl_animation_frames_saved_total": (
+        "Number of overtime animation frames skipped by attention policy."
+    ),
+}
+HISTOGRAMS = {
+    "xitomatl_hook_duration_seconds": "Execution time of hook commands.",
+}
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    text = ",".join(f'{name}="{_escape(str(value))}"' for name, value in sorted(labels))
+    return f"{{{text}}}"
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Status:
+    def __init__(self, task_index, task_name, state, minutes, elapsed):
+        self.task_index = task_index
+        self.task_name = task_name
+        self.state = state
+        self.minutes = minutes
+        self.started = time.monotonic() - elapsed
+
+
+class Metrics:
+    """Thread-safe store for metrics."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = defaultdict(int)
+        self.histograms = {}
+        self.status = None
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(DURATION_BUCKETS)
+                self.histograms[key] = histogram
+            histogram.observe(value)
+
+    def set_status(self, task_index, task_name, state, minutes, elapsed=0.0):
+        status = Status(task_index, task_name, state, minutes, elapsed)
+        with self.lock:
+            self.status = status
+
+    def _render_status(self, lines):
+        status = self.status
+        if status is None:
+            return
+
+        elapsed = time.monotonic() - status.started
+        lines.append("# HELP xitomatl_state Timer state (0 stopped, 1 running).")
+        lines.append("# TYPE xitomatl_state gauge")
+        lines.append(f"xitomatl_state {status.state}")
+        lines.append("# HELP xitomatl_task_info Current task.")
+        lines.append("# TYPE xitomatl_task_info gauge")
+        labels = _labels((("index", status.task_index + 1), ("name", status.task_name)))
+        lines.append(f"xitomatl_task_info{labels} 1")
+        if status.state == State.Running:
+            remaining = status.minutes * 60 - elapsed
+            lines.append("# HELP xitomatl_elapsed_seconds Elapsed time of the task.")
+            lines.append("# TYPE xitomatl_elapsed_seconds gauge")
+            lines.append(f"xitomatl_elapsed_seconds {elapsed:.3f}")
+            lines.append(
+                "# HELP xitomatl_remaining_seconds Remaining time of the task"
+                " (negative in overtime)."
+            )
+            lines.append("# TYPE xitomatl_remaining_seconds gauge")
+            lines.append(f"xitomatl_remaining_seconds {remaining:.3f}")
+
+    def _render_counters(self, lines):
+        for name, help_text in COUNTERS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (key_name, labels), value in sorted(self.counters.items()):
+                if key_name == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+
+    def _render_histograms(self, lines):
+        for name, help_text in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (key_name, labels), histogram in sorted(self.histograms.items()):
+                if key_name != name:
+                    continue
+                count = 0
+                bounds = [*(str(b) for b in histogram.buckets), "+Inf"]
+                for bound, bucket_count in zip(bounds, histogram.counts):
+                    count += bucket_count
+                    bucket_labels = _labels((*labels, ("le", bound)))
+                    lines.append(f"{name}_bucket{bucket_labels} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+
+    def render(self):
+        lines = []
+        with self.lock:
+            self._render_status(lines)
+            self._render_counters(lines)
+            self._render_histograms(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+
+metrics = Metrics()
@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+HTTP server for metrics in Prometheus text format.
+
+The server runs in a background thread and reads only the snapshot kept in
+Metrics so it never needs to touch Qt objects.
+"""
+
+import os
+import socket
+import stat
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from threading import Thread
+
+from xitomatl.log import log
+from xitomatl.metrics import metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LOCALHOST = "127.0.0.1"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", maxsplit=1)[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Client address is empty for Unix sockets.
+        return str(self.client_address or "unix")
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        log.debug("Metrics: " + format, *args)
+
+
+class _MetricsServerMixin:
+    daemon_threads = True
+
+    def __init__(self, address, metrics):
+        self.metrics = metrics
+        super().__init__(address, MetricsHandler)
+
+
+class MetricsHTTPServer(_MetricsServerMixin, ThreadingHTTPServer):
+    pass
+
+
+class UnixHTTPServer(_MetricsServerMixin, ThreadingMixIn, UnixStreamServer):
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ""
+
+
+def _remove_stale_socket(path):
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"Metrics socket path is not a socket: {path}")
+
+    # Socket is stale only if nothing listens on it.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise FileExistsError(f"Metrics socket is in use: {path}")
+
+
+def serve_metrics(port=None, socket_path=None, metrics=metrics):
+    """
+    Serve metrics at /metrics in a background thread.
+
+    Listens only on localhost TCP port or on a Unix socket.
+    """
+    if socket_path:
+        _remove_stale_socket(socket_path)
+        server = UnixHTTPServer(socket_path, metrics)
+    else:
+        server = MetricsHTTPServer((LOCALHOST, port), metrics)
+
+    thread = Thread(target=server.serve_forever, name="metrics", daemon=True)
+    thread.start()
+    log.info("Serving metrics on %s", server.server_address)
+    return server
+
+
+def serve_metrics_from_settings(settings):
+    port = settings.value("metrics_port")
+    socket_path = settings.value("metrics_socket")
+    if not port and not socket_path:
+        return None
+
+    try:
+        return serve_metrics(port=int(port or 0), socket_path=socket_path)
+    except OSError:
+        log.exception("Failed to start metrics server")
+        return None
@@ -1,204 +1,74 @@
 # SPDX-License-Identifier: LGPL-2.0-or-later
-import shlex
-from contextlib import contextmanager
-from subprocess import run  # nosec B404
-
-from PySide6.QtCore import QElapsedTimer, Qt, QTimer
-from PySide6.QtGui import QColor
-
-from xitomatl.log import log
-from xitomatl.state import State
-from xitomatl.tasks import (
-    DEFAULT_TASK_CACHE_KEY,
-    Break,
-    Task,
-    read_task,
-    read_tasks,
-    to_bool,
-)
-
-SHORT_BREAK_COUNT = 3
-
-
-def _run(command):
-    for subcommand in command.split("\n"):
-        subcommand = subcommand.strip()
-        if subcommand:
-            log.info("Executing: %s", subcommand)
-            args = shlex.split(subcommand)
-            run(args, shell=False, check=True)  # nosec B603
-
-
-def default_pomodoro_tasks():
-    focus = Task(minutes=25)
-    short_break = Break(minutes=5)
-    long_break = Break(minutes=30, in_menu=True)
-    return [focus, short_break] * SHORT_BREAK_COUNT + [focus, long_break]
-
-
-def default_stopped_task():
-    return Task(
-        name="stopped",
-        color=QColor("#ff0040"),
-        text_color=QColor("white"),
-        minutes=0,
-    )
-
-
-@contextmanager
-def readArray(settings, name):
-    try:
-        settings.beginReadArray(name)
-        yield
-    except Exception:
-        log.exception(
-            "Failed to read [%s] from configuration file %s",
-            name,
-            settings.fileName(),
-        )
-        raise
-    finally:
-        settings.endArray()
-
-
-@contextmanager
-def enterGroup(settings, name):
-    try:
-        settings.beginGroup(name)
-        yield
-    except Exception:
-        log.exception(
-            "Failed to read [%s] from configuration file %s",
-            name,
-            settings.fileName(),
-        )
-        raise
-    finally:
-        settings.endGroup()
+"""
+Pomodoro timer driven by Qt timers.
+"""
 
+import os
 
-class Pomodoro:
-    def __init__(self, settings):
-        self.state = State.Stopped
+from PySide6.QtCore import QObject, QStandardPaths, Qt, QTimer, Signal
 
-        with readArray(settings, "tasks"):
-            self.tasks = read_tasks(settings) or default_pomodoro_tasks()
+from xitomatl.checkpoint import CHECKPOINT_FILE_NAME
+from xitomatl.core import pomodoro as core
+from xitomatl.core.pomodoro import SHORT_BREAK_COUNT, State
+from xitomatl.log import APP_ID, log
+from xitomatl.trace import EVENT_SCHEDULE_TIMER, EVENT_TIMER, traced
 
-        with enterGroup(settings, "stopped"):
-            task_cache = {DEFAULT_TASK_CACHE_KEY: default_stopped_task()}
-            self.stopped_task = read_task(settings, task_cache)
+__all__ = ("SHORT_BREAK_COUNT", "Pomodoro", "State")
 
-        self.current_task_index = 0
-        self.elapsed = QElapsedTimer()
-        self.elapsed.start()
 
-        self.timer = QTimer()
-        self.timer.setSingleShot(True)
-        self.timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
-        self.timer.timeout.connect(self.on_timeout)
-        self.finished = True
+class _Signals(QObject):
+    changed = Signal(object)
 
-        log.info("[%s] Initialized", self)
 
-        autostart = settings.value("autostart", "true")
-        if to_bool(autostart):
-            self.start()
+class Pomodoro(core.Pomodoro):
+    def __init__(self, settings, trace=None, **kwargs):
+        self.signals = _Signals()
 
-    def __str__(self):
-        state = "⏸︎" if self.state == State.Stopped else "⏵︎"
-        return (
-            f"{self.current_task_index + 1}/{len(self.tasks)}"
-            f" {self.current_task()}"
-            f" {self.elapsed_minutes()}m {state}"
+        self.schedule_timer = QTimer()
+        self.schedule_timer.setSingleShot(True)
+        self.schedule_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.schedule_timer.timeout.connect(
+            traced(trace, EVENT_SCHEDULE_TIMER, self.on_schedule_timeout)
         )
 
-    def current_task(self):
-        if self.state == State.Running:
-            return self.tasks[self.current_task_index]
-
-        return self.stopped_task
-
-    def start_task(self, index):
-        log.info("[%s] Select start", self)
-        if self.state == State.Running:
-            self._run_command_stop()
-        self.state = State.Running
-        self.current_task_index = index
-        self.on_changed()
-        self._run_command_start()
-
-    def stop(self):
-        log.info("[%s] Stop", self)
-        if self.state == State.Running:
-            self._run_command_stop()
-        self.state = State.Stopped
-        self.current_task_index = -1
-        self.on_changed()
-
-    def elapsed_minutes(self):
-        return int(self.elapsed.elapsed() / 60000)
-
-    def remaining_minutes(self):
-        return self.current_task().minutes - self.elapsed_minutes()
-
-    def start(self):
-        log.info("[%s] Start", self)
-        if self.state == State.Running:
-            self._run_command_stop()
-        if self.current_task_index == -1:
-            self.current_task_index = 0
-        self.state = State.Running
-        self.on_changed()
-        self._run_command_start()
-
-    def next(self):
-        log.info("[%s] Next", self)
-        if self.state == State.Running:
-            self._run_command_stop()
-        self.current_task_index = (self.current_task_index + 1) % len(self.tasks)
-        self.on_changed()
-        self._run_command_start()
-
-    def finish(self):
-        log.info("[%s] Finished", self)
-        self.finished = True
-        self._run_command_finish()
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.timer.timeout.connect(traced(trace, EVENT_TIMER, self.on_timeout))
+
+        super().__init__(settings, **kwargs)
 
     @property
-    def state_changed(self):
-        return self.timer.timeout
+    def changed(self):
+        """Signal with ChangeEvent, emitted only if anything changed."""
+        return self.signals.changed
 
-    def on_changed(self):
-        self.elapsed.restart()
-        self.finished = False
-        log.info("[%s]", self)
-        self.timer.timeout.emit()
+    def default_checkpoint_path(self):
+        path = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.GenericStateLocation
+        )
+        return os.path.join(path, APP_ID, CHECKPOINT_FILE_NAME)
 
     def on_timeout(self):
-        if self.state == State.Stopped:
+        interval, countdown = self.update()
+        if interval is None:
             return
 
-        elapsed = self.elapsed.elapsed()
-        remaining = self.current_task().minutes * 60000 - elapsed
-
-        if not self.finished and remaining <= 0:
-            self.finish()
-
-        interval = remaining % 60000
-        if interval == 0:
-            interval += 60000
-        interval += 1000
+        if countdown:
+            self.timer.setTimerType(Qt.TimerType.CoarseTimer)
+        else:
+            self.timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
         log.debug("Scheduling next update in %s ms", interval)
         self.timer.start(interval)
 
-    def _run_command_start(self):
-        task = self.current_task()
-        _run(task.command_start)
+    def _notify(self):
+        self.on_timeout()
+
+    def _emit_change(self, event):
+        self.signals.changed.emit(event)
 
-    def _run_command_stop(self):
-        task = self.current_task()
-        _run(task.command_stop)
+    def _start_schedule_timer(self, interval):
+        self.schedule_timer.start(interval)
 
-    def _run_command_finish(self):
-        task = self.current_task()
-        _run(task.command_finish)
+    def _stop_schedule_timer(self):
+        self.schedule_timer.stop()
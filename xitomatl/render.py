@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+from collections import OrderedDict
+from functools import partial
+from threading import Lock
+
+from PySide6.QtCore import QObject, QThreadPool, Signal
+from PySide6.QtGui import QImage
+
+from xitomatl.icon import IconLayers
+from xitomatl.log import log
+from xitomatl.metrics import metrics
+
+MAX_CACHED_ICONS = 16
+
+
+class _Signals(QObject):
+    finished = Signal(object, QImage, bool, object)
+
+
+class IconRenderer(QObject):
+    """
+    Renders icons in a worker thread.
+
+    Finished images are delivered to the GUI thread with icon_rendered signal.
+    Only the latest requested icon is delivered; queued requests which are no
+    longer needed (neither requested nor prefetched since) are skipped.
+
+    Delays of animated task image frames (empty if static) are delivered with
+    each requested icon in frames_ready signal, so the image is decoded only
+    in the worker thread.
+    """
+
+    icon_rendered = Signal(QImage)
+    frames_ready = Signal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.layers = IconLayers()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+
+        self.signals = _Signals()
+        self.signals.finished.connect(self._on_finished)
+
+        self.lock = Lock()
+        self.wanted_key = None
+        self.prefetch_keys = set()
+        self.pending = {}
+        self.cache = OrderedDict()
+
+    def is_needed(self, key):
+        with self.lock:
+            return key == self.wanted_key or key in self.prefetch_keys
+
+    def render_now(self, request):
+        """Render icon synchronously."""
+        return self.layers.icon(request)
+
+    def render(self, request):
+        """
+        Request rendering icon asynchronously.
+
+        This drops all previous prefetch requests.
+        """
+        key = request.key()
+        cached = self.cache.get(key)
+        with self.lock:
+            self.prefetch_keys.clear()
+            self.wanted_key = None if cached is not None else key
+
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self._deliver(request, *cached)
+        else:
+            self._submit(request, key)
+
+    def prefetch(self, request):
+        """Render icon in advance so later render() request is fast."""
+        key = request.key()
+        if key in self.cache:
+            return
+
+        with self.lock:
+            self.prefetch_keys.add(key)
+        self._submit(request, key)
+
+    def wait(self):
+        self.pool.waitForDone()
+
+    def _submit(self, request, key):
+        if key in self.pending:
+            return
+        self.pending[key] = request
+        self.pool.start(partial(self._run_job, request, key))
+
+    def _run_job(self, request, key):
+        # Called in a worker thread.
+        image = QImage()
+        delays = []
+        skipped = not self.is_needed(key)
+        if not skipped:
+            try:
+                image = self.render_now(request)
+                delays = self.layers.frame_delays(request.task, request.icon_size)
+                metrics.inc("xitomatl_icon_renders_total")
+            except Exception:
+                log.exception("Failed to render icon")
+        self.signals.finished.emit(key, image, skipped, delays)
+
+    def _on_finished(self, key, image, skipped, delays):
+        request = self.pending.pop(key)
+        if skipped:
+            # The job may have been skipped just before it was requested again.
+            if self.is_needed(key):
+                self._submit(request, key)
+            return
+
+        if image.isNull():
+            return
+
+        self.cache[key] = (image, delays)
+        if len(self.cache) > MAX_CACHED_ICONS:
+            self.cache.popitem(last=False)
+
+        with self.lock:
+            self.prefetch_keys.discard(key)
+            wanted = key == self.wanted_key
+            if wanted:
+                self.wanted_key = None
+
+        if wanted:
+            self._deliver(request, image, delays)
+
+    def _deliver(self, request, image, delays):
+        self.icon_rendered.emit(image)
+        self.frames_ready.emit(request.task, delays)
@@ -0,0 +1,210 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Wall-clock schedule of tasks for a day.
+
+Schedule file contains one entry per line:
+
+    # Comment
+    09:00 focus
+    + break
+    + focus 50
+    10:00 standup 15
+    + focus
+
+Entry starting with a clock time (HH:MM) is fixed and starts at given time.
+Entry starting with "+" is relative and starts when the previous one ends,
+but never after the next fixed entry. The task name refers to a task from the
+configuration file and is followed by optional number of minutes overriding
+the task's default.
+
+The plan repeats every day. Only the first entry for each task name is shown
+in the menu.
+
+Entries are kept sorted by start time so that finding the entry that should
+be running and the next transition are binary searches. When the user
+starts an entry at a different time, only entries up to the next fixed entry
+that does not move need to be updated.
+"""
+
+import math
+from bisect import bisect_right
+from copy import copy
+from dataclasses import dataclass
+from datetime import datetime
+
+RELATIVE = "+"
+# Time after midnight which is always in the next day, even with DST changes.
+NEXT_DAY_OFFSET = 30 * 3600
+
+
+@dataclass
+class ScheduleEntry:
+    task: object
+    # Seconds since midnight for fixed entries, None for relative ones
+    fixed: float | None = None
+
+
+def parse_clock_time(text):
+    hours, minutes = text.split(":")
+    hours = int(hours)
+    minutes = int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time: {text}")
+    return hours * 3600 + minutes * 60
+
+
+def local_midnight(now):
+    """Returns start of the local day containing given time."""
+    day = datetime.fromtimestamp(now)
+    return day.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def parse_schedule(lines, tasks):
+    """Returns list of ScheduleEntry from schedule lines."""
+    tasks_by_name = {}
+    for task in tasks:
+        tasks_by_name.setdefault(task.name, task)
+
+    entries = []
+    names = set()
+    last_fixed = -1
+    for line_number, line in enumerate(lines, start=1):
+        line = line.split("#", maxsplit=1)[0].strip()
+        if not line:
+            continue
+
+        try:
+            start, name, *rest = line.split()
+            if len(rest) > 1:
+                raise ValueError("Too many values")
+
+            task = tasks_by_name.get(name)
+            if task is None:
+                raise ValueError(f"Unknown task: {name}")
+            task = copy(task)
+            task.in_menu = task.in_menu and name not in names
+            names.add(name)
+            if rest:
+                task.minutes = int(rest[0])
+
+            if start == RELATIVE:
+                fixed = None
+            else:
+                fixed = parse_clock_time(start)
+                if fixed < last_fixed:
+                    raise ValueError("Fixed times must not decrease")
+                last_fixed = fixed
+        except ValueError as e:
+            raise ValueError(
+                f"Invalid schedule entry on line {line_number}: {e}"
+            ) from e
+
+        entries.append(ScheduleEntry(task, fixed))
+
+    return entries
+
+
+class Schedule:
+    def __init__(self, entries, day_start, start):
+        """
+        Creates schedule from entries.
+
+        The day_start is the local midnight time, start is the time the
+        leading relative entries start (both in seconds since epoch).
+        """
+        if not entries:
+            raise ValueError("Schedule is empty")
+
+        self.entries = entries
+        # Start time of each entry, always sorted.
+        self.starts = [0.0] * len(entries)
+        # Start time of the next fixed entry for each entry.
+        self.next_fixed = [math.inf] * len(entries)
+        self._start_day(day_start, start)
+
+    @classmethod
+    def load(cls, path, tasks, now):
+        with open(path, encoding="utf-8") as f:
+            entries = parse_schedule(f, tasks)
+        return cls(entries, local_midnight(now), now)
+
+    def _start_day(self, day_start, start):
+        self.day_start = day_start
+        self.next_day_start = local_midnight(day_start + NEXT_DAY_OFFSET)
+
+        next_fixed = math.inf
+        for i in range(len(self.entries) - 1, -1, -1):
+            self.next_fixed[i] = next_fixed
+            if self.entries[i].fixed is not None:
+                next_fixed = day_start + self.entries[i].fixed
+
+        fixed = self.entries[0].fixed
+        self.reschedule(0, start if fixed is None else day_start + fixed)
+
+    def roll_over(self, now):
+        """
+        Starts the plan for the next day if given time is past the current one.
+
+        Returns True if the day changed.
+        """
+        if now < self.next_day_start:
+            return False
+
+        self._start_day(local_midnight(now), now)
+        return True
+
+    def __len__(self):
+        return len(self.entries)
+
+    def tasks(self):
+        return [entry.task for entry in self.entries]
+
+    def end(self, index):
+        return self.starts[index] + self.entries[index].task.minutes * 60
+
+    def index_at(self, now):
+        """Returns index of entry that should be running at given time."""
+        return max(0, bisect_right(self.starts, now) - 1)
+
+    def next_transition(self, now):
+        """Returns start time of the next entry or start of the next day."""
+        i = bisect_right(self.starts, now)
+        if i < len(self.starts):
+            return self.starts[i]
+        return self.next_day_start
+
+    def reschedule(self, index, start):
+        """
+        Updates schedule after the entry at index started at given time.
+
+        Entries before index which would start later are skipped (moved to
+        the start time) and following entries are regenerated until a fixed
+        entry which does not move.
+
+        Returns number of updated entries.
+        """
+        updated = 1
+        self.starts[index] = start
+
+        i = index - 1
+        while i >= 0 and self.starts[i] > start:
+            self.starts[i] = start
+            updated += 1
+            i -= 1
+
+        for i in range(index + 1, len(self.entries)):
+            start = self._start_after(i)
+            if start == self.starts[i] and self.entries[i].fixed is not None:
+                break
+            self.starts[i] = start
+            updated += 1
+
+        return updated
+
+    def _start_after(self, index):
+        previous = self.starts[index - 1]
+        fixed = self.entries[index].fixed
+        if fixed is not None:
+            return max(previous, self.day_start + fixed)
+        end = min(self.end(index - 1), self.next_fixed[index - 1])
+        return max(previous, end)
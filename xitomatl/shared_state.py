@@ -0,0 +1,182 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Shared memory-mapped state file.
+
+The running app publishes the current task into a small fixed-layout file so
+that shell prompts, status lines and editor plugins can read it without any
+IPC. This module depends only on the standard library so readers can import
+it (or copy it) cheaply.
+
+Layout (little-endian):
+
+    offset  type      field
+    0       char[4]   magic "XTML"
+    4       uint32    layout version
+    8       uint64    sequence counter (odd while the writer is updating)
+    16      int32     task index (-1 if stopped)
+    20      uint32    state (0 stopped, 1 running)
+    24      float64   task start time (seconds since epoch)
+    32      int32     planned minutes
+    36      uint32    flags (bit 0: finished)
+    40      char[64]  task name (UTF-8, zero-padded)
+
+Writers use seqlock protocol: increment the sequence counter to an odd
+value, write the data, increment the counter to an even value. Readers retry
+if the counter is odd or changes while reading.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+MAGIC = b"XTML"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+DATA = struct.Struct("<iIdiI64s")
+SEQUENCE_OFFSET = 8
+SIZE = HEADER.size + DATA.size
+FLAG_FINISHED = 1
+STATE_STOPPED = 0
+STATE_RUNNING = 1
+READ_RETRIES = 1000
+FILE_NAME = "xitomatl.state"
+
+
+class SharedState(
+    namedtuple(
+        "SharedState",
+        ("task_index", "name", "state", "started", "minutes", "finished", "sequence"),
+        defaults=(0,),
+    )
+):
+    __slots__ = ()
+
+    @property
+    def running(self):
+        return self.state == STATE_RUNNING
+
+    def elapsed_seconds(self, now=None):
+        return (time.time() if now is None else now) - self.started
+
+    def remaining_seconds(self, now=None):
+        return self.minutes * 60 - self.elapsed_seconds(now)
+
+
+def default_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, FILE_NAME)
+
+    # Temporary directory can be shared by all users.
+    name = FILE_NAME
+    if hasattr(os, "getuid"):
+        name = f"xitomatl-{os.getuid()}.state"
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+class SharedStateWriter:
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        # Do not follow a symlink planted in a shared directory.
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0)
+        fd = os.open(self.path, flags, 0o600)
+        try:
+            os.ftruncate(fd, SIZE)
+            self.map = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+        # Continue the sequence of a previous run so readers notice the change.
+        magic, version, sequence = HEADER.unpack_from(self.map, 0)
+        if magic == MAGIC and version == VERSION:
+            self.sequence = sequence + sequence % 2
+        else:
+            self.sequence = 0
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, self.sequence)
+
+    def write(self, state):
+        """Publishes SharedState (its sequence is ignored)."""
+        data = DATA.pack(
+            state.task_index,
+            state.state,
+            state.started,
+            state.minutes,
+            FLAG_FINISHED if state.finished else 0,
+            state.name.encode("utf-8"),
+        )
+        self._set_sequence(self.sequence + 1)
+        self.map[HEADER.size : SIZE] = data
+        self._set_sequence(self.sequence + 1)
+
+    def close(self):
+        self.map.close()
+
+    def _set_sequence(self, sequence):
+        self.sequence = sequence
+        struct.pack_into("<Q", self.map, SEQUENCE_OFFSET, sequence)
+
+
+class SharedStateReader:
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        with open(self.path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), SIZE, access=mmap.ACCESS_READ)
+
+        magic, version, _ = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"Unsupported state file: {self.path}")
+
+    def read(self):
+        """Returns consistent SharedState or None if the writer is too busy."""
+        for _ in range(READ_RETRIES):
+            (sequence,) = struct.unpack_from("<Q", self.map, SEQUENCE_OFFSET)
+            if sequence % 2 == 1:
+                continue
+            data = self.map[HEADER.size : SIZE]
+            (sequence2,) = struct.unpack_from("<Q", self.map, SEQUENCE_OFFSET)
+            if sequence == sequence2:
+                task_index, state, started, minutes, flags, name = DATA.unpack(data)
+                return SharedState(
+                    task_index,
+                    name.rstrip(b"\0").decode("utf-8", errors="replace"),
+                    state,
+                    started,
+                    minutes,
+                    bool(flags & FLAG_FINISHED),
+                    sequence,
+                )
+        return None
+
+    def close(self):
+        self.map.close()
+
+
+def read_state(path=None):
+    reader = SharedStateReader(path)
+    try:
+        return reader.read()
+    finally:
+        reader.close()
+
+
+def main():
+    """Print current task and remaining minutes, for example for prompts."""
+    try:
+        state = read_state(sys.argv[1] if len(sys.argv) > 1 else None)
+    except (OSError, ValueError):
+        return 1
+
+    if state is None or not state.running:
+        print("⏸︎")
+    else:
+        remaining = state.minutes - int(state.elapsed_seconds() // 60)
+        print(f"{state.name} {remaining}m")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Stream of JSON status lines for status bars.
+
+Each line is compatible with waybar custom module with "return-type": "json".
+"""
+
+import json
+import os
+import stat
+import sys
+
+from PySide6.QtCore import QSocketNotifier
+
+from xitomatl.log import log
+from xitomatl.state import State
+
+CLASS_NORMAL = "normal"
+CLASS_TIMED_OUT = "timed-out"
+CLASS_STOPPED = "stopped"
+
+
+def status(pomodoro):
+    task = pomodoro.current_task()
+    remaining = pomodoro.remaining_minutes()
+    if pomodoro.state == State.Stopped:
+        css_class = CLASS_STOPPED
+    elif remaining <= 0:
+        css_class = CLASS_TIMED_OUT
+    else:
+        css_class = CLASS_NORMAL
+
+    # Only values with minute resolution so the line changes only with the
+    # displayed minute.
+    elapsed = pomodoro.elapsed_minutes()
+    if task.minutes > 0:
+        percentage = min(100, elapsed * 100 // task.minutes)
+    else:
+        percentage = 100
+
+    text = str(pomodoro)
+    return {
+        "text": text,
+        "tooltip": text,
+        "alt": task.name,
+        "class": css_class,
+        "percentage": percentage,
+        "task": task.name,
+        "task_index": pomodoro.current_task_index,
+        "state": "running" if pomodoro.state == State.Running else "stopped",
+        "minutes": task.minutes,
+        "elapsed_minutes": elapsed,
+        "remaining_minutes": remaining,
+    }
+
+
+def open_fifo(path):
+    if not os.path.exists(path):
+        os.mkfifo(path, 0o600)
+    elif not stat.S_ISFIFO(os.stat(path).st_mode):
+        raise ValueError(f"Status stream path is not a named pipe: {path}")
+
+    # Opening for reading too avoids blocking until a reader connects.
+    return os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+
+class StatusStream:
+    """
+    Writes status line whenever the visible status changes.
+
+    Lines are written whole: if the stream is full, the rest of a partially
+    written line is written once the stream is writable again, followed by
+    the latest status line (older unwritten lines are dropped).
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.last_line = None
+        # Unwritten rest of line being written
+        self.tail = b""
+        self.tail_line = None
+        # Latest line waiting to be written
+        self.pending = None
+        self.notifier = None
+
+    @classmethod
+    def open(cls, path):
+        if path == "-":
+            return cls(sys.stdout.fileno())
+        return cls(open_fifo(path))
+
+    def update(self, pomodoro):
+        if self.fd is None:
+            return
+
+        line = json.dumps(status(pomodoro), ensure_ascii=False)
+        if line == (self.tail_line if self.tail else self.last_line):
+            self.pending = None
+        else:
+            self.pending = line
+        self.flush()
+
+    def flush(self):
+        """Writes pending data, returns True if everything was written."""
+        if self.fd is None:
+            return True
+
+        try:
+            while self.tail or self.pending is not None:
+                if not self.tail:
+                    self.tail = f"{self.pending}\n".encode()
+                    self.tail_line = self.pending
+                    self.pending = None
+                written = os.write(self.fd, self.tail)
+                self.tail = self.tail[written:]
+                if not self.tail:
+                    self.last_line = self.tail_line
+        except BlockingIOError:
+            log.debug("Status stream is full, waiting until it is writable")
+            self._wait_until_writable()
+            return False
+        except OSError:
+            log.exception("Failed to write status, closing status stream")
+            self.fd = None
+
+        if self.notifier:
+            self.notifier.setEnabled(False)
+        return True
+
+    def _wait_until_writable(self):
+        if self.notifier is None:
+            self.notifier = QSocketNotifier(self.fd, QSocketNotifier.Type.Write)
+            self.notifier.activated.connect(self.flush)
+        self.notifier.setEnabled(True)
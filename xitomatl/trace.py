@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: LGPL-2.0-or-later
+"""
+Traces of input events and timer firings for reproducing performance issues.
+
+Trace file starts with a header (magic "XTRC", version as uint32 and
+wall-clock time the trace started as float64 seconds since epoch) followed by
+fixed-size little-endian records:
+
+    float64  time since the trace started (seconds, monotonic clock)
+    float32  time spent handling the event (seconds)
+    uint8    event type
+    int32    event argument (activation reason or task index)
+
+See replay.py for replaying traces.
+"""
+
+import struct
+import time
+from collections import namedtuple
+
+MAGIC = b"XTRC"
+VERSION = 2
+HEADER = struct.Struct("<4sId")
+RECORD = struct.Struct("<dfBi")
+
+EVENT_ACTIVATED = 1
+EVENT_CLICK_TIMER = 2
+EVENT_MENU_START = 3
+EVENT_MENU_NEXT = 4
+EVENT_MENU_STOP = 5
+EVENT_MENU_TASK = 6
+EVENT_TIMER = 7
+EVENT_SCHEDULE_TIMER = 8
+EVENT_FRAME_TIMER = 9
+EVENT_ANIMATION_TIMER = 10
+
+EVENT_NAMES = {
+    EVENT_ACTIVATED: "activated",
+    EVENT_CLICK_TIMER: "click-timer",
+    EVENT_MENU_START: "menu-start",
+    EVENT_MENU_NEXT: "menu-next",
+    EVENT_MENU_STOP: "menu-stop",
+    EVENT_MENU_TASK: "menu-task",
+    EVENT_TIMER: "timer",
+    EVENT_SCHEDULE_TIMER: "schedule-timer",
+    EVENT_FRAME_TIMER: "frame-timer",
+    EVENT_ANIMATION_TIMER: "animation-timer",
+}
+
+TraceRecord = namedtuple("TraceRecord", ("time", "duration", "event", "arg"))
+Trace = namedtuple("Trace", ("started", "records"))
+
+
+class TraceWriter:
+    def __init__(self, path, clock=time.monotonic, wall_clock=time.time):
+        self.clock = clock
+        self.start = clock()
+        # pylint: disable=consider-using-with
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, wall_clock()))
+        self.file.flush()
+
+    def write(self, event, started, duration, arg=0):
+        record = RECORD.pack(started - self.start, duration, event, arg)
+        # Flush each record so the trace is complete even if the app is killed.
+        self.file.write(record)
+        self.file.flush()
+
+    def wrap(self, event, handler, arg=None):
+        """
+        Returns handler which records the event.
+
+        If arg is None, the first argument passed to the handler is recorded.
+        """
+
+        def traced(*args):
+            value = arg
+            if value is None:
+                value = int(getattr(args[0], "value", args[0])) if args else 0
+            started = self.clock()
+            try:
+                return handler(*args)
+            finally:
+                self.write(event, started, self.clock() - started, value)
+
+        return traced
+
+    def close(self):
+        self.file.close()
+
+
+def traced(trace, event, handler, arg=None):
+    """Returns handler recording the event if trace is set."""
+    if trace is None:
+        return handler
+    return trace.wrap(event, handler, arg)
+
+
+def read_trace(path):
+    """Returns Trace with wall-clock start time and list of TraceRecord."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"Unsupported trace file: {path}")
+        magic, version, started = HEADER.unpack(header)
+        if (magic, version) != (MAGIC, VERSION):
+            raise ValueError(f"Unsupported trace file: {path}")
+        data = f.read()
+
+    # Ignore incomplete record at the end.
+    end = len(data) - len(data) % RECORD.size
+    records = [TraceRecord(*fields) for fields in RECORD.iter_unpack(data[:end])]
+    return Trace(started, records)